@@ -1,76 +1,86 @@
+import atexit
+import concurrent.futures
 from collections import deque
 from collections import defaultdict
 
 import common
+import grid
 import search
+import supergrid
 from snake import Snake
-from bitset import Bitset
 
 ###############################################################################
 
 def adjacent(width, height, position):
-    """Get all in bound locations adjacent to position."""
-    possible = [common.add_elements(position, x) for x in Snake.VALID_DIRECTIONS]
-    return list(filter(
-                lambda x: common.in_bounds(x, (width, height)),
-                possible))
+    """Get all in bound locations adjacent to position, as a tuple shared by
+    every caller.
+    """
+    board = grid.board(width, height)
+    return board.adjacent[position[0] + position[1] * width]
+
+def turns_until_free(width, height, snake):
+    """For each cell (packed as in grid), the number of turns until the snake
+    moves off it, or 0 if it isn't under the snake.
+    """
+    turns = [0] * (width * height)
+    # Walk from the tail so the segment nearest the head sets the count.
+    for index in range(len(snake) - 1, -1, -1):
+        x, y = snake[index]
+        turns[x + y * width] = len(snake) - index - 1
+    return turns
+
+def free_turns(width, height, snake, head, laid_at):
+    """Return a per-cell list and an offset that add up to the turns until
+    each cell is free (zero or less if it already is), reading them from the
+    game's laid_at array when there is one. |head| is the head's cell.
+    """
+    if laid_at is None:
+        return turns_until_free(width, height, snake), 0
+    # The head was laid on this move, so this is len(snake) - 1 - moves.
+    return laid_at, len(snake) - 1 - laid_at[head]
 
-def shortest_path(width, height, start, end, blocked):
+def shortest_path(width, height, start, end, blocked, reachable_only=False):
     """Find the shortest path from start to end on a width by height grid that
     doesn't pass through any squares in the "blocked" collection.
+
+    If reachable_only is true, an empty list is returned in place of the path
+    as soon as end is known to be reachable.
     """
-    checked = set()
-    blocked_set = set(blocked)
-    blocked_set.discard(start)
-    blocked_set.discard(end)
-
-    def heuristic(position):
-        return common.grid_distance(position, end)
-
-    def list_moves(position):
-        possible = list(filter(
-                lambda x:  not x in checked
-                    and not x in blocked_set,
-                adjacent(width, height, position)))
-        checked.update(possible)
-        return list([common.subtract_elements(x, position) for x in possible])
-
-    def apply_move(position, move):
-        return common.add_elements(position, move)
-
-    return search.original_a_star_search(
-        start_state=start,
-        heuristic=heuristic,
-        list_moves=list_moves,
-        apply_move=apply_move)
+    return grid.find_path(width, height, start, end, blocked,
+            reachable_only=reachable_only)
 
-def flood_distance(width, height, target, snake):
+def flood_distance(width, height, target, snake, laid_at=None):
     """Approximate the shortest possible path by which a snake can reach a
     target using a variant of flood fill.
+
+    If the game's laid_at array (see Snake.get_laid_at) is given, it is used
+    to tell when the snake's cells come free instead of scanning the snake.
     """
-    assert common.in_bounds(target, (width, height))
+    assert 0 <= target[0] < width and 0 <= target[1] < height
 
     if snake[0] == target:
         return 0
 
+    neighbors = grid.board(width, height).neighbors
+    start = snake[0][0] + snake[0][1] * width
+    turns, offset = free_turns(width, height, snake, start, laid_at)
+    target = target[0] + target[1] * width
+
     steps = 0
     fringe = defaultdict(list)
-    fringe[0].append(snake[0])
-    explored = {snake[0]}
+    fringe[0].append(start)
+    explored = bytearray(width * height)
+    explored[start] = 1
 
     while True:
         front = fringe[steps]
         for search_from in front:
-            possible_next_positions = adjacent(width, height, search_from)
-            for next in possible_next_positions:
-                if next in explored:
+            for next in neighbors[search_from]:
+                if explored[next]:
                     continue
-                explored.add(next)
+                explored[next] = 1
 
-                next_steps = steps + 1
-                if next in snake:
-                    turns_till_available = len(snake) - snake.index(next) - 1
-                    next_steps = max(next_steps, turns_till_available)
+                next_steps = max(steps + 1, turns[next] + offset)
 
                 if next == target:
                     return next_steps
@@ -84,70 +94,39 @@ def flood_distance(width, height, target, snake):
 def supergrid_factor(width, height, snake):
     """Calculate the size of the largest area of connected 2x2 regions of the
     map."""
+    occupancy = grid.blocked_cells(width, height, snake)
+    return supergrid.Supergrid(width, height, occupancy).largest()
 
-    # Build a set for fast access
-    snake_set = set(snake)
-
-    # Calculate supercell size
-    def supercell_valid(x, y):
-        return 0 <= x and x+1 < width \
-            and 0 <= y and y+1 < height \
-            and (x,y) not in snake_set \
-            and (x+1,y) not in snake_set \
-            and (x,y+1) not in snake_set \
-            and (x+1,y+1) not in snake_set
-
-    explored = set()
-    largest_found = 0
-    for x in range(0, width, 2):
-        for y in range(0, height, 2):
-            if not supercell_valid(x,y):
-                continue
-            if (x,y) in explored:
-                continue
-            
-            # DFS for the connected components
-            component = set()
-            fringe = [(x,y)]
-            while fringe:
-                val = fringe.pop()
-                if val not in component and supercell_valid(val[0], val[1]):
-                    component.add(val)
-                    fringe.append((val[0] + 2, val[1]))
-                    fringe.append((val[0] - 2, val[1]))
-                    fringe.append((val[0], val[1] + 2))
-                    fringe.append((val[0], val[1] - 2))
-
-            largest_found = max(largest_found, len(component))
-            explored.update(component)
-    
-    return largest_found
-
-def navigation_factor(width, height, snake):
+def navigation_factor(width, height, snake, laid_at=None):
     """Approximate difficulty of navigating the map by calculating a lower
     bound on the steps it would take to reach each other tile.
+
+    laid_at is as for flood_distance.
     """
+    neighbors = grid.board(width, height).neighbors
+    start = snake[0][0] + snake[0][1] * width
+    turns, offset = free_turns(width, height, snake, start, laid_at)
+
     steps = 0
     fringe = defaultdict(list)
-    fringe[0].append(snake[0])
-    explored = {snake[0]}
+    fringe[0].append(start)
+    explored = bytearray(width * height)
+    explored[start] = 1
+    remaining = width * height - 1
     result = 0
 
-    while len(explored) < width * height:
+    while remaining:
         front = fringe[steps]
         for search_from in front:
-            possible_next_positions = adjacent(width, height, search_from)
-            for next in possible_next_positions:
-                if next in explored:
+            for next in neighbors[search_from]:
+                if explored[next]:
                     continue
 
-                next_steps = steps + 1
-                if next in snake:
-                    turns_till_available = len(snake) - snake.index(next) - 1
-                    next_steps = max(next_steps, turns_till_available)
+                next_steps = max(steps + 1, turns[next] + offset)
 
                 fringe[next_steps].append(next)
-                explored.add(next)
+                explored[next] = 1
+                remaining -= 1
                 result += next_steps
 
         steps = steps + 1
@@ -222,27 +201,23 @@ def ai_hamiltonian(game):
 
 # Very Very Slow
 def ai_bfs_goal(game):
-    start_state = game.copy()
-    start_state.first_move = None
-    fringe = deque([start_state])
+    # Fringe contents are a tuple with: (state, first_move)
+    fringe = deque([(game.copy(), None)])
 
     while fringe:
-        state = fringe.popleft()
+        state, first_move = fringe.popleft()
         for dir in Snake.VALID_DIRECTIONS:
             new_state = state.copy()
             new_state.advance(dir)
 
             # Pass through the original move to get to this path.
-            if state.first_move is None:
-                new_state.first_move = dir
-            else:
-                new_state.first_move = state.first_move
+            new_first_move = dir if first_move is None else first_move
 
             if new_state.get_state() == Snake.PLAYING:
-                fringe.append(new_state)
+                fringe.append((new_state, new_first_move))
 
             if new_state.get_points() > game.get_points():
-                return new_state.first_move
+                return new_first_move
     
     return Snake.NORTH
 
@@ -280,15 +255,6 @@ def ai_a_star_culled(game):
     filled squares once
     """
     goal = game.get_goal()
-    tested = set()
-
-    def to_bitset(game):
-        res = Bitset()
-        for x in range(game.get_width()):
-            for y in range(game.get_height()):
-                if (x,y) in game.get_snake_position():
-                    res.set(x + y * game.get_width())
-        return res
 
     def heuristic(game):
         head = game.get_snake_head()
@@ -302,10 +268,6 @@ def ai_a_star_culled(game):
     def apply_move(game, move):
         copy = game.copy()
         copy.advance(move)
-        image = to_bitset(copy)
-        if image in tested:
-            return None
-        tested.add(image)
         return copy
 
     path = search.original_a_star_search(
@@ -313,7 +275,8 @@ def ai_a_star_culled(game):
         heuristic=heuristic,
         list_moves=list_moves,
         apply_move=apply_move,
-        copy_interval=0)
+        copy_interval=0,
+        state_key=lambda game: game.get_occupancy_key())
 
     if path:
         return path[0]
@@ -328,15 +291,6 @@ def ai_a_star_culled_then_to_tail(game):
         return ai_data.pop()
 
     goal = game.get_goal()
-    tested = set()
-
-    def to_dedupe(game):
-        res = Bitset()
-        for x in range(game.get_width()):
-            for y in range(game.get_height()):
-                if (x,y) in game.get_snake_position():
-                    res.set(x + y * game.get_width())
-        return (game.get_snake_head(), res)
 
     def heuristic(game):
         head = game.get_snake_head()
@@ -351,11 +305,6 @@ def ai_a_star_culled_then_to_tail(game):
         copy = game.copy()
         copy.advance(move)
 
-        dedupe = to_dedupe(copy)
-        if dedupe in tested:
-            return None
-        tested.add(dedupe)
-
         # If a move would take you to the goal, make sure that after reaching
         # the goal you can then reach your own tail.
         if heuristic(copy) == 0:
@@ -364,7 +313,8 @@ def ai_a_star_culled_then_to_tail(game):
                         copy.get_height(),
                         copy.get_snake_head(),
                         copy.get_snake_tail(),
-                        copy.get_snake_position()
+                        copy.get_snake_position(),
+                        reachable_only=True
                     ) is None:
                 return None
 
@@ -375,7 +325,8 @@ def ai_a_star_culled_then_to_tail(game):
         heuristic=heuristic,
         list_moves=list_moves,
         apply_move=apply_move,
-        copy_interval=0)
+        copy_interval=0,
+        state_key=lambda game: game.get_state_key())
 
     if path:
         game.set_ai_data(path[1:][::-1])
@@ -388,15 +339,6 @@ def ai_a_star_culled_always_tail(game):
         return ai_data.pop()
 
     goal = game.get_goal()
-    tested = set()
-
-    def to_dedupe(game):
-        res = Bitset()
-        for x in range(game.get_width()):
-            for y in range(game.get_height()):
-                if (x,y) in game.get_snake_position():
-                    res.set(x + y * game.get_width())
-        return (game.get_snake_head(), res)
 
     def heuristic(game):
         head = game.get_snake_head()
@@ -417,15 +359,11 @@ def ai_a_star_culled_always_tail(game):
                     copy.get_height(),
                     copy.get_snake_head(),
                     copy.get_snake_tail(),
-                    copy.get_snake_position()
+                    copy.get_snake_position(),
+                    reachable_only=True
                 ) is None:
             return None
 
-        dedupe = to_dedupe(copy)
-        if dedupe in tested:
-            return None
-        tested.add(dedupe)
-
         return copy
 
     path = search.original_a_star_search(
@@ -433,7 +371,8 @@ def ai_a_star_culled_always_tail(game):
         heuristic=heuristic,
         list_moves=list_moves,
         apply_move=apply_move,
-        copy_interval=0)
+        copy_interval=0,
+        state_key=lambda game: game.get_state_key())
 
     if path:
         game.set_ai_data(path[1:][::-1])
@@ -446,20 +385,11 @@ def ai_a_star_culled_always_tail_better_heuristic(game):
         return ai_data.pop()
 
     goal = game.get_goal()
-    tested = set()
-
-    def to_dedupe(game):
-        res = Bitset()
-        for x in range(game.get_width()):
-            for y in range(game.get_height()):
-                if (x,y) in game.get_snake_position():
-                    res.set(x + y * game.get_width())
-        return (game.get_snake_head(), res)
 
     def heuristic(game):
         head = game.get_snake_head()
         return flood_distance(game.get_width(), game.get_height(), goal,
-                game.get_snake_position())
+                game.get_snake_position(), game.get_laid_at())
 
     def list_moves(game):
         return list(filter(
@@ -476,15 +406,11 @@ def ai_a_star_culled_always_tail_better_heuristic(game):
                     copy.get_height(),
                     copy.get_snake_head(),
                     copy.get_snake_tail(),
-                    copy.get_snake_position()
+                    copy.get_snake_position(),
+                    reachable_only=True
                 ) is None:
             return None
 
-        dedupe = to_dedupe(copy)
-        if dedupe in tested:
-            return None
-        tested.add(dedupe)
-
         return copy
 
     path = search.original_a_star_search(
@@ -492,7 +418,8 @@ def ai_a_star_culled_always_tail_better_heuristic(game):
         heuristic=heuristic,
         list_moves=list_moves,
         apply_move=apply_move,
-        copy_interval=0)
+        copy_interval=0,
+        state_key=lambda game: game.get_state_key())
 
     if path:
         game.set_ai_data(path[1:][::-1])
@@ -526,7 +453,8 @@ def ai_a_star_limited(game):
                     copy.get_height(),
                     copy.get_snake_head(),
                     copy.get_snake_tail(),
-                    copy.get_snake_position()
+                    copy.get_snake_position(),
+                    reachable_only=True
                 ) is None:
             return None
         return copy
@@ -559,17 +487,22 @@ def ai_a_star_limited(game):
     
     return Snake.NORTH
 
-def ai_simple_explore(game):
-    MAX_DEPTH = 5
+def ai_a_star_timed(game):
+    """As ai_a_star_limited, but limits the search by time rather than by
+    states searched, so each move takes at most about TIME_BUDGET seconds.
+    If time runs out, takes the first step towards the closest state to the
+    goal found so far.
+    """
+    TIME_BUDGET = 0.05
+    ai_data = game.get_ai_data()
+    if ai_data:
+        return ai_data.pop()
 
     goal = game.get_goal()
-    starting_points = game.get_points()
 
     def heuristic(game):
-        base = game.get_width() + game.get_height()
-        if game.get_points() > starting_points:
-            return base + game.get_moves_since_point()
-        return base - common.grid_distance(game.get_snake_head(), goal)
+        head = game.get_snake_head()
+        return common.grid_distance(head, goal)
 
     def list_moves(game):
         return list(filter(
@@ -586,51 +519,268 @@ def ai_simple_explore(game):
                     copy.get_height(),
                     copy.get_snake_head(),
                     copy.get_snake_tail(),
-                    copy.get_snake_position()
+                    copy.get_snake_position(),
+                    reachable_only=True
                 ) is None:
             return None
         return copy
 
-    path = search.explore_state_space(
+    path, partial = search.original_a_star_search_timed(
         start_state=game,
         heuristic=heuristic,
         list_moves=list_moves,
         apply_move=apply_move,
-        depth=MAX_DEPTH)
+        copy_interval=0,
+        state_key=lambda game: game.get_state_key(),
+        time_budget=TIME_BUDGET)
 
     if path:
+        if not partial:
+            game.set_ai_data(path[1:][::-1])
         return path[0]
 
+    head = game.get_snake_head()
+    tail = game.get_snake_tail()
+    blocked = list(filter(lambda x: x != head and x != tail, game.get_snake_position()))
+    path = shortest_path(
+        width=game.get_width(),
+        height=game.get_height(),
+        start=head,
+        end=tail,
+        blocked=blocked)
+
+    if path:
+        game.set_ai_data(path[1:][::-1])
+        return path[0]
+    
     return Snake.NORTH
 
-def ai_complex_explore(game):
-    DEPTH = 4
+def ai_a_star_bounded(game):
+    """As ai_a_star_limited, but searches with SMA* so no more than
+    MAX_NODES game states are held at once however hard the search gets.
+    """
+    MAX_NODES = 500
+    SEARCH_LIMIT = 2000
+    ai_data = game.get_ai_data()
+    if ai_data:
+        return ai_data.pop()
 
     goal = game.get_goal()
-    starting_points = game.get_points()
 
-    starting_nav=navigation_factor(game.get_width(), game.get_height(), game.get_snake_position())
+    def heuristic(game):
+        head = game.get_snake_head()
+        return common.grid_distance(head, goal)
+
+    def list_moves(game):
+        return list(filter(
+                lambda x: game.is_direction_safe(x),
+                Snake.VALID_DIRECTIONS))
+
+    def apply_move(game, move):
+        copy = game.copy()
+        copy.advance(move)
+        
+        # Make sure that you can reach your own tail from this position.
+        if shortest_path(
+                    copy.get_width(),
+                    copy.get_height(),
+                    copy.get_snake_head(),
+                    copy.get_snake_tail(),
+                    copy.get_snake_position(),
+                    reachable_only=True
+                ) is None:
+            return None
+        return copy
+
+    path = search.sma_star_search(
+        start_state=game,
+        heuristic=heuristic,
+        list_moves=list_moves,
+        apply_move=apply_move,
+        max_nodes=MAX_NODES,
+        search_limit=SEARCH_LIMIT,
+        state_key=lambda game: game.get_state_key())
+
+    if path:
+        game.set_ai_data(path[1:][::-1])
+        return path[0]
+
+    head = game.get_snake_head()
+    tail = game.get_snake_tail()
+    blocked = list(filter(lambda x: x != head and x != tail, game.get_snake_position()))
+    path = shortest_path(
+        width=game.get_width(),
+        height=game.get_height(),
+        start=head,
+        end=tail,
+        blocked=blocked)
+
+    if path:
+        game.set_ai_data(path[1:][::-1])
+        return path[0]
+    
+    return Snake.NORTH
+
+def ai_a_star_iterative(game):
+    """As ai_a_star_limited, but searches with IDA* so only the game states
+    along the current path are held at once.
+    """
+    SEARCH_LIMIT = 500
+    ai_data = game.get_ai_data()
+    if ai_data:
+        return ai_data.pop()
+
+    goal = game.get_goal()
+
+    def heuristic(game):
+        head = game.get_snake_head()
+        return common.grid_distance(head, goal)
+
+    def list_moves(game):
+        return list(filter(
+                lambda x: game.is_direction_safe(x),
+                Snake.VALID_DIRECTIONS))
+
+    def apply_move(game, move):
+        copy = game.copy()
+        copy.advance(move)
+        
+        # Make sure that you can reach your own tail from this position.
+        if shortest_path(
+                    copy.get_width(),
+                    copy.get_height(),
+                    copy.get_snake_head(),
+                    copy.get_snake_tail(),
+                    copy.get_snake_position(),
+                    reachable_only=True
+                ) is None:
+            return None
+        return copy
+
+    path = search.ida_star_search(
+        start_state=game,
+        heuristic=heuristic,
+        list_moves=list_moves,
+        apply_move=apply_move,
+        search_limit=SEARCH_LIMIT,
+        state_key=lambda game: game.get_state_key())
+
+    if path:
+        game.set_ai_data(path[1:][::-1])
+        return path[0]
+
+    head = game.get_snake_head()
+    tail = game.get_snake_tail()
+    blocked = list(filter(lambda x: x != head and x != tail, game.get_snake_position()))
+    path = shortest_path(
+        width=game.get_width(),
+        height=game.get_height(),
+        start=head,
+        end=tail,
+        blocked=blocked)
+
+    if path:
+        game.set_ai_data(path[1:][::-1])
+        return path[0]
+    
+    return Snake.NORTH
+
+def ai_simple_explore(game):
+    MAX_DEPTH = 5
+
+    goal = game.get_goal()
+    starting_points = game.get_points()
 
     def heuristic(game):
+        base = game.get_width() + game.get_height()
+        if game.get_points() > starting_points:
+            return base + game.get_moves_since_point()
+        return base - common.grid_distance(game.get_snake_head(), goal)
+
+    def upper_bound(game, remaining):
+        # Each move adds at most one to the moves since the last point, and
+        # the goal has to be reached before that starts counting.
+        base = game.get_width() + game.get_height()
+        if game.get_points() > starting_points:
+            return base + game.get_moves_since_point() + remaining
+        return base + remaining - common.grid_distance(game.get_snake_head(), goal)
+
+    def list_moves(game):
+        return list(filter(
+                lambda x: game.is_direction_safe(x),
+                Snake.VALID_DIRECTIONS))
+
+    def apply_move(game, move):
+        game.push_move(move)
+        
+        # Make sure that you can reach your own tail from this position.
+        if shortest_path(
+                    game.get_width(),
+                    game.get_height(),
+                    game.get_snake_head(),
+                    game.get_snake_tail(),
+                    game.get_snake_position(),
+                    reachable_only=True
+                ) is None:
+            return None
+        return game
+
+    def undo_move(game):
+        game.pop_move()
+
+    path = search.explore_state_space(
+        start_state=game.copy(),
+        heuristic=heuristic,
+        list_moves=list_moves,
+        apply_move=apply_move,
+        undo_move=undo_move,
+        upper_bound=upper_bound,
+        depth=MAX_DEPTH)
+
+    if path:
+        return path[0]
+
+    return Snake.NORTH
+
+class ComplexExplorer:
+    """Search callbacks for ai_complex_explore. Kept in a class rather than
+    closures so the search can be pickled out to a process pool.
+    """
+
+    def __init__(self, game):
+        self.goal = game.get_goal()
+        self.starting_points = game.get_points()
+        self.starting_nav = navigation_factor(game.get_width(),
+                game.get_height(), game.get_snake_position(),
+                game.get_laid_at())
+
+    def heuristic(self, game):
         def want_points():
-            if game.get_points() > starting_points:
+            if game.get_points() > self.starting_points:
                 return common.sigmoid(game.get_moves_since_point())
             else:
                 return common.sigmoid(-flood_distance(
                     game.get_width(),
                     game.get_height(),
-                    goal,
-                    game.get_snake_position()))
+                    self.goal,
+                    game.get_snake_position(),
+                    game.get_laid_at()))
 
         def want_supergrid():
             w = game.get_width()
             h = game.get_height()
             snake = game.get_snake_position()
-            return supergrid_factor(w, h, snake) / ((w // 2) * (h // 2) - len(snake) / 4 + 1)
+            tracked = game.get_supergrid()
+            if tracked is not None:
+                largest = tracked.largest()
+            else:
+                largest = supergrid_factor(w, h, snake)
+            return largest / ((w // 2) * (h // 2) - len(snake) / 4 + 1)
 
         def want_navigability():
-            nav = navigation_factor(game.get_width(), game.get_height(), game.get_snake_position())
-            return common.sigmoid(starting_nav - nav)
+            nav = navigation_factor(game.get_width(), game.get_height(),
+                    game.get_snake_position(), game.get_laid_at())
+            return common.sigmoid(self.starting_nav - nav)
 
         p = want_points()
         s = want_supergrid()
@@ -639,34 +789,83 @@ def ai_complex_explore(game):
                 + s \
                 + n
 
-    def list_moves(game):
+    def list_moves(self, game):
         return list(filter(
                 lambda x: game.is_direction_safe(x),
                 Snake.VALID_DIRECTIONS))
 
-    def apply_move(game, move):
-        copy = game.copy()
-        copy.advance(move)
+    def apply_move(self, game, move):
+        game.push_move(move)
         
         # Make sure that you can reach your own tail from this position.
         if shortest_path(
-                    copy.get_width(),
-                    copy.get_height(),
-                    copy.get_snake_head(),
-                    copy.get_snake_tail(),
-                    copy.get_snake_position()
+                    game.get_width(),
+                    game.get_height(),
+                    game.get_snake_head(),
+                    game.get_snake_tail(),
+                    game.get_snake_position(),
+                    reachable_only=True
                 ) is None:
             return None
-        return copy
+        return game
+
+    def undo_move(self, game):
+        game.pop_move()
+
+def ai_complex_explore(game):
+    DEPTH = 4
 
+    explorer = ComplexExplorer(game)
+    start = game.copy()
+    start.track_supergrid()
     path = search.explore_state_space(
-        start_state=game,
-        heuristic=heuristic,
-        list_moves=list_moves,
-        apply_move=apply_move,
+        start_state=start,
+        heuristic=explorer.heuristic,
+        list_moves=explorer.list_moves,
+        apply_move=explorer.apply_move,
+        undo_move=explorer.undo_move,
         depth=DEPTH)
 
     if path:
         return path[0]
 
     return Snake.NORTH
+
+# Process pool for the parallel AIs, created when first needed. Each process
+# that plays a parallel AI gets its own pool, so keep this small when playing
+# many games at once (e.g. runner.py --workers).
+PARALLEL_WORKERS = 4
+PARALLEL_POOL = None
+
+def parallel_pool():
+    global PARALLEL_POOL
+    if PARALLEL_POOL is None:
+        PARALLEL_POOL = concurrent.futures.ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS)
+        atexit.register(PARALLEL_POOL.shutdown)
+    return PARALLEL_POOL
+
+def ai_complex_explore_parallel(game):
+    """As ai_complex_explore, but looks a move further ahead by spreading
+    the search over a process pool.
+    """
+    DEPTH = 5
+    SPLIT_DEPTH = 2
+
+    explorer = ComplexExplorer(game)
+    start = game.copy()
+    start.track_supergrid()
+    path = search.explore_state_space(
+        start_state=start,
+        heuristic=explorer.heuristic,
+        list_moves=explorer.list_moves,
+        apply_move=explorer.apply_move,
+        undo_move=explorer.undo_move,
+        depth=DEPTH,
+        executor=parallel_pool(),
+        split_depth=SPLIT_DEPTH)
+
+    if path:
+        return path[0]
+
+    return Snake.NORTH
@@ -1,4 +1,13 @@
+import random
+
 from ai import *
+from snake import Snake
+
+def test_adjacent():
+    assert adjacent(4, 4, (0,0)) == ((0,1), (1,0))
+    assert adjacent(4, 4, (1,1)) == ((1,0), (1,2), (0,1), (2,1))
+    assert adjacent(4, 4, (3,3)) == ((3,2), (2,3))
+    assert adjacent(4, 4, (1,1)) is adjacent(4, 4, (1,1))
 
 def test_shortest_path():
     assert shortest_path(
@@ -39,4 +48,18 @@ def test_navigation_factor():
     c = navigation_factor(8,8, [(0,0), (1,0),(1,1),(1,2),(1,3),(1,4),(1,5),(1,6),(1,7)])
     d = navigation_factor(8,8, [(0,0), (1,0),(2,0),(3,0),(4,0),(5,0),(6,0),(7,0),(7,1)])
     assert d < c
-    
\ No newline at end of file
+    
+def test_laid_at_matches_snake_scan():
+    random.seed(6)
+    for _ in range(10):
+        game = Snake(6, 6)
+        while game.get_state() == Snake.PLAYING:
+            snake = game.get_snake_position()
+            laid_at = game.get_laid_at()
+            target = (random.randrange(6), random.randrange(6))
+            assert flood_distance(6, 6, target, snake, laid_at) \
+                == flood_distance(6, 6, target, snake)
+            assert navigation_factor(6, 6, snake, laid_at) \
+                == navigation_factor(6, 6, snake)
+            safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+            game.advance(random.choice(safe) if safe else Snake.NORTH)
@@ -0,0 +1,169 @@
+import numpy as np
+
+from snake import Snake
+
+# Direction vectors in the order of Snake.VALID_DIRECTIONS. Moves given to
+# BatchSnake.advance are indices into this table.
+DIRECTION_X = np.array([x[0] for x in Snake.VALID_DIRECTIONS])
+DIRECTION_Y = np.array([x[1] for x in Snake.VALID_DIRECTIONS])
+
+class BatchSnake:
+    """Many games of snake on boards of the same size, advanced in lockstep.
+
+    Follows the same rules as Snake.advance but keeps every game in NumPy
+    arrays so a whole batch takes one vectorized step. Cells are indexed by
+    x + y * width throughout.
+
+    Goals are placed by a NumPy generator per game, not by Snake's rule of
+    reseeding before each goal, so a batch game and a Snake with the same
+    seed get different goals. Compare games through to_snake, which copies
+    the goal across.
+    """
+
+    def __init__(self, count, width, height, seeds=None):
+        """Create |count| new games. |seeds| is an optional sequence of
+        |count| non-negative integer seeds for the per-game random generators
+        that place goals. Random seeds are picked if none are given.
+        """
+        cells = width * height
+        self.count = count
+        self.width = width
+        self.height = height
+
+        # Each snake body is a ring buffer running from head_index to
+        # tail_index. A snake never has more than width * height + 2
+        # segments (the starting segments are stacked on one cell).
+        self.capacity = cells + 3
+        self.body = np.zeros((count, self.capacity), dtype=np.int32)
+        self.head_index = np.zeros(count, dtype=np.int64)
+        self.tail_index = np.full(count, 2, dtype=np.int64)
+
+        # Number of snake segments on each cell.
+        self.occupancy = np.zeros((count, cells), dtype=np.int8)
+
+        start = width // 2 + (height // 2) * width
+        self.body[:, 0:3] = start
+        self.occupancy[:, start] = 3
+
+        self.state = np.full(count, Snake.PLAYING, dtype=np.int8)
+        self.moves = np.zeros(count, dtype=np.int64)
+        self.points = np.zeros(count, dtype=np.int64)
+        self.moves_since_point = np.zeros(count, dtype=np.int64)
+
+        if seeds is None:
+            seeds = np.random.default_rng().integers(2 ** 63, size=count)
+        self.seeds = [int(x) for x in seeds]
+        assert len(self.seeds) == count
+        self.rngs = [np.random.default_rng(seed) for seed in seeds]
+
+        self.goal = np.zeros(count, dtype=np.int64)
+        self.generate_goals(np.arange(count))
+
+    def generate_goals(self, games):
+        """Place a new goal for each of |games|, marking any game without a
+        free cell left as won.
+        """
+        for game in games:
+            free = np.flatnonzero(self.occupancy[game] == 0)
+            if free.size:
+                self.goal[game] = free[self.rngs[game].integers(free.size)]
+            else:
+                self.state[game] = Snake.WON
+
+    def get_heads(self):
+        """Return an array of the (x, y) head position of every game."""
+        heads = self.body[np.arange(self.count), self.head_index]
+        return np.stack([heads % self.width, heads // self.width], axis=1)
+
+    def get_goals(self):
+        """Return an array of the (x, y) goal position of every game."""
+        return np.stack([self.goal % self.width, self.goal // self.width], axis=1)
+
+    def get_lengths(self):
+        return (self.tail_index - self.head_index) % self.capacity + 1
+
+    def safe_directions(self):
+        """Return a count by 4 boolean array of which directions are safe to
+        move in for each game, as Snake.is_direction_safe.
+        """
+        games = np.arange(self.count)
+        heads = self.body[games, self.head_index]
+        tails = self.body[games, self.tail_index]
+        x = (heads % self.width)[:, None] + DIRECTION_X
+        y = (heads // self.width)[:, None] + DIRECTION_Y
+        in_bounds = (0 <= x) & (x < self.width) & (0 <= y) & (y < self.height)
+        cells = np.where(in_bounds, x + y * self.width, 0)
+        blocking = self.occupancy[games[:, None], cells] \
+                - (cells == tails[:, None])
+        return in_bounds & (blocking == 0)
+
+    def advance(self, directions):
+        """Advance every game still being played by one move.
+
+        |directions| holds one index into Snake.VALID_DIRECTIONS per game.
+        Any other value kills that game, as an invalid direction does in
+        Snake.advance. Entries for finished games are ignored.
+        """
+        directions = np.asarray(directions)
+        games = np.flatnonzero(self.state == Snake.PLAYING)
+        if not games.size:
+            return
+
+        self.moves[games] += 1
+        self.moves_since_point[games] += 1
+
+        direction = directions[games]
+        valid = (0 <= direction) & (direction < len(DIRECTION_X))
+        direction = np.where(valid, direction, 0)
+
+        heads = self.body[games, self.head_index[games]]
+        tails = self.body[games, self.tail_index[games]]
+        x = heads % self.width + DIRECTION_X[direction]
+        y = heads // self.width + DIRECTION_Y[direction]
+        in_bounds = (0 <= x) & (x < self.width) & (0 <= y) & (y < self.height)
+        next = np.where(in_bounds, x + y * self.width, 0)
+
+        # The tail moves out of the way, so it doesn't count as blocking.
+        blocking = self.occupancy[games, next] - (next == tails)
+        died = ~valid | ~in_bounds | (blocking > 0)
+        self.state[games[died]] = Snake.DIED
+
+        alive = ~died
+        games = games[alive]
+        next = next[alive]
+        tails = tails[alive]
+
+        self.head_index[games] = (self.head_index[games] - 1) % self.capacity
+        self.body[games, self.head_index[games]] = next
+        self.occupancy[games, next] += 1
+
+        ate = next == self.goal[games]
+        moving = games[~ate]
+        self.occupancy[moving, tails[~ate]] -= 1
+        self.tail_index[moving] = (self.tail_index[moving] - 1) % self.capacity
+
+        scored = games[ate]
+        self.points[scored] += 1
+        self.moves_since_point[scored] = 0
+        self.generate_goals(scored)
+
+    def to_snake(self, game):
+        """Build a Snake with the same position, goal and seed as one game
+        in the batch. Goals the Snake places after this one come from Snake's
+        own rule, so they won't match the batch's.
+        """
+        length = self.get_lengths()[game]
+        ring = (self.head_index[game] + np.arange(length)) % self.capacity
+        result = Snake(self.width, self.height, self.seeds[game])
+        # The body's laid_at stamps count back from the move number, so it
+        # has to be in place first.
+        result.moves = int(self.moves[game])
+        result.points = int(self.points[game])
+        result.moves_since_point = int(self.moves_since_point[game])
+        result.set_snake_position(
+                (int(x % self.width), int(x // self.width))
+                for x in self.body[game, ring])
+        result.goal = (int(self.goal[game] % self.width),
+                int(self.goal[game] // self.width))
+        result.state = int(self.state[game])
+        return result
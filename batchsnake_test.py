@@ -0,0 +1,100 @@
+import numpy as np
+
+import ai
+from batchsnake import BatchSnake
+from snake import Snake
+
+def test_starting_position():
+    batch = BatchSnake(3, 6, 6, seeds=[0, 1, 2])
+    assert (batch.get_heads() == [3, 3]).all()
+    assert (batch.get_lengths() == 3).all()
+    assert (batch.state == Snake.PLAYING).all()
+    for game in range(3):
+        assert batch.occupancy[game, batch.goal[game]] == 0
+
+def test_seeds_are_reproducible():
+    a = BatchSnake(4, 8, 8, seeds=[5, 6, 7, 8])
+    b = BatchSnake(4, 8, 8, seeds=[5, 6, 7, 8])
+    assert (a.goal == b.goal).all()
+
+def test_to_snake_keeps_seed():
+    batch = BatchSnake(2, 8, 8, seeds=[5, 6])
+    assert [batch.to_snake(x).get_seed() for x in range(2)] == [5, 6]
+
+    batch = BatchSnake(2, 8, 8)
+    assert [batch.to_snake(x).get_seed() for x in range(2)] == batch.seeds
+
+def test_matches_snake_rules():
+    rng = np.random.default_rng(0)
+    count = 64
+    batch = BatchSnake(count, 5, 5, seeds=range(count))
+    games = [batch.to_snake(x) for x in range(count)]
+
+    for _ in range(300):
+        # Mostly safe moves, with the odd unsafe or invalid one.
+        safe = batch.safe_directions()
+        directions = np.array([
+                rng.choice(np.flatnonzero(row)) if row.any() and rng.random() < 0.95
+                    else rng.integers(-1, 5)
+                for row in safe])
+        for game, direction in zip(games, directions):
+            if 0 <= direction < 4:
+                game.advance(Snake.VALID_DIRECTIONS[direction])
+            else:
+                game.advance(None)
+        batch.advance(directions)
+
+        for idx, game in enumerate(games):
+            # Goals are drawn from different generators, so copy them over.
+            if game.get_state() == Snake.PLAYING:
+                game.goal = batch.to_snake(idx).get_goal()
+            expected = batch.to_snake(idx)
+            assert game.get_state() == expected.get_state()
+            assert game.get_snake_position() == expected.get_snake_position()
+            assert game.get_occupancy() == expected.get_occupancy()
+            assert game.get_points() == expected.get_points()
+            assert game.get_moves() == expected.get_moves()
+            assert game.get_moves_since_point() == expected.get_moves_since_point()
+            for direction, safe in enumerate(batch.safe_directions()[idx]):
+                if game.get_state() == Snake.PLAYING:
+                    assert game.is_direction_safe(Snake.VALID_DIRECTIONS[direction]) == safe
+
+    assert (batch.state != Snake.PLAYING).any()
+    assert batch.points.max() > 0
+
+def test_win_when_board_full():
+    batch = BatchSnake(1, 2, 2, seeds=[0])
+    while batch.state[0] == Snake.PLAYING:
+        head = batch.get_heads()[0]
+        # Walk clockwise around the 2x2 board.
+        direction = {(0,0): 3, (1,0): 1, (1,1): 2, (0,1): 0}[tuple(head)]
+        batch.advance([direction])
+    assert batch.state[0] == Snake.WON
+    assert (batch.occupancy[0] > 0).all()
+
+def test_to_snake_laid_at_matches_body_scan():
+    rng = np.random.default_rng(1)
+    count = 16
+    batch = BatchSnake(count, 8, 8, seeds=range(count))
+    for _ in range(47):
+        batch.advance([rng.choice(np.flatnonzero(row)) if row.any() else 0
+                for row in batch.safe_directions()])
+
+    checked = 0
+    for idx in range(count):
+        game = batch.to_snake(idx)
+        safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+        if game.get_state() != Snake.PLAYING or not safe:
+            continue
+        game.advance(safe[0])
+        if game.get_state() != Snake.PLAYING:
+            continue
+        snake = game.get_snake_position()
+        laid_at = game.get_laid_at()
+        assert ai.navigation_factor(8, 8, snake, laid_at) \
+            == ai.navigation_factor(8, 8, snake)
+        for target in [(0,0), (7,7), (3,4)]:
+            assert ai.flood_distance(8, 8, target, snake, laid_at) \
+                == ai.flood_distance(8, 8, target, snake)
+        checked += 1
+    assert checked > 0
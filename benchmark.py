@@ -0,0 +1,194 @@
+"""Micro-benchmarks for the hot paths of the game engine and the AIs.
+
+Run with `python benchmark.py`. Each benchmark prints its rate so changes can
+be compared before and after.
+"""
+import collections
+import os
+import random
+import subprocess
+import sys
+import timeit
+import types
+
+import ai
+import common
+from snake import Snake
+
+###############################################################################
+
+def late_game(width, height, length):
+    """Build a game whose snake winds back and forth over the first |length|
+    cells of the board, as it might late in a game.
+    """
+    path = []
+    for y in range(height):
+        row = [(x, y) for x in range(width)]
+        path.extend(row if y % 2 else row[::-1])
+    game = Snake(width, height)
+    game.set_snake_position(path[:length][::-1])
+    game.goal = game.generate_goal()
+    return game
+
+def report(name, count, seconds):
+    print('{:<40} {:>12,.0f} / sec'.format(name, count / seconds))
+
+###############################################################################
+
+def baseline_copy(game):
+    """The copy path from before Snake.copy cloned its fields: build a fresh
+    game the way the old constructor did, scanning the board for a goal, then
+    copy the body over. Only the work is reproduced; the result is a plain
+    namespace, not a Snake.
+    """
+    width, height = game.width, game.height
+    other = types.SimpleNamespace()
+    other.width = width
+    other.height = height
+    other.state = Snake.PLAYING
+    other.snake_position = collections.deque([(width // 2, height // 2)] * 3)
+    possibilities = [(x, y) for x in range(width) for y in range(height)
+            if (x, y) not in other.snake_position]
+    other.goal = random.choice(possibilities)
+    other.moves = 0
+    other.points = 0
+    other.moves_since_point = 0
+    other.font = None
+    other.win_text = None
+    other.lose_text = None
+    other.ai_data = None
+    other.snake_position = game.snake_position.copy()
+    other.goal = game.goal
+    other.moves = game.moves
+    other.points = game.points
+    other.moves_since_point = game.moves_since_point
+    return other
+
+def bench_copy():
+    for size, length in [(10, 30), (30, 200)]:
+        game = late_game(size, size, length)
+        count = 20000
+        name = 'copy {}x{} len {}'.format(size, size, length)
+        report(name + ' (baseline)', count,
+                timeit.timeit(lambda: baseline_copy(game), number=count))
+        report(name + ' (clone)', count,
+                timeit.timeit(game.copy, number=count))
+
+###############################################################################
+
+def list_adjacent(width, height, position):
+    """ai.adjacent as it was before the neighbor tables."""
+    possible = [common.add_elements(position, x) for x in Snake.VALID_DIRECTIONS]
+    return list(filter(
+                lambda x: common.in_bounds(x, (width, height)),
+                possible))
+
+def bench_adjacent():
+    for size in [30, 100]:
+        positions = [(x, y) for y in range(size) for x in range(size)]
+        ai.adjacent(size, size, (0, 0))
+        name = 'adjacent {}x{}'.format(size, size)
+        for label, adjacent in [('list', list_adjacent), ('table', ai.adjacent)]:
+            seconds = timeit.timeit(
+                    lambda: [adjacent(size, size, x) for x in positions],
+                    number=5)
+            report('{} ({})'.format(name, label), 5 * len(positions), seconds)
+
+def bench_flood():
+    import floodfield
+
+    for size in [30, 100]:
+        game = late_game(size, size, size * size // 3)
+        snake = game.get_snake_position()
+        laid_at = game.get_laid_at()
+        count = 5
+        name = 'navigation_factor {}x{}'.format(size, size)
+        for label, run in [
+                ('ai', lambda: ai.navigation_factor(size, size, snake)),
+                ('ai laid_at',
+                    lambda: ai.navigation_factor(size, size, snake, laid_at)),
+                ('numpy', lambda: floodfield.navigation_factor(
+                    size, size, snake, laid_at))]:
+            report('{} ({})'.format(name, label), count,
+                    timeit.timeit(run, number=count))
+
+def bench_supergrid():
+    for size in [30, 100]:
+        game = late_game(size, size, size * size // 3)
+        snake = game.get_snake_position()
+        count = 20
+        name = 'supergrid {}x{}'.format(size, size)
+        report(name + ' (rebuilt)', count, timeit.timeit(
+                lambda: ai.supergrid_factor(size, size, snake), number=count))
+
+        # A move and its undo, as a search makes them, then a query.
+        game.track_supergrid()
+        direction = next(x for x in Snake.VALID_DIRECTIONS
+                if game.is_direction_safe(x))
+
+        def tracked():
+            game.push_move(direction)
+            game.get_supergrid().largest()
+            game.pop_move()
+        report(name + ' (tracked)', count * 10,
+                timeit.timeit(tracked, number=count * 10))
+
+###############################################################################
+
+def bench_batch():
+    import numpy as np
+    from batchsnake import BatchSnake
+
+    count = 2000
+    steps = 200
+    rng = np.random.default_rng(0)
+
+    def run_batch():
+        batch = BatchSnake(count, 30, 30, seeds=range(count))
+        for _ in range(steps):
+            # Pick a random safe direction where there is one.
+            weights = batch.safe_directions() * rng.random((count, 4))
+            batch.advance(np.argmax(weights, axis=1))
+        return int(batch.moves.sum())
+
+    def run_single():
+        moves = 0
+        for _ in range(count // 20):
+            game = Snake(30, 30)
+            for _ in range(steps):
+                safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+                game.advance(safe[rng.integers(len(safe))] if safe else Snake.NORTH)
+            moves += game.get_moves()
+        return moves
+
+    for name, run in [('moves 30x30 (Snake)', run_single),
+            ('moves 30x30 (BatchSnake)', run_batch)]:
+        start = timeit.default_timer()
+        moves = run()
+        report(name, moves, timeit.default_timer() - start)
+
+###############################################################################
+
+def bench_imports():
+    """Time fresh interpreters importing the engine, as a worker process
+    would, with and without pygame.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    count = 10
+    for name, modules in [
+            ('worker startup', 'snake, ai, supercellerator'),
+            ('worker startup with pygame', 'pygame, snake, ai, supercellerator')]:
+        seconds = timeit.timeit(lambda: subprocess.run(
+                [sys.executable, '-c', 'import ' + modules],
+                cwd=here, check=True, stdout=subprocess.DEVNULL), number=count)
+        report(name, count, seconds)
+
+###############################################################################
+
+if __name__ == '__main__':
+    bench_copy()
+    bench_adjacent()
+    bench_flood()
+    bench_supergrid()
+    bench_batch()
+    bench_imports()
@@ -0,0 +1,94 @@
+"""NumPy versions of ai.flood_distance and ai.navigation_factor.
+
+Both functions in ai flood outwards from the snake's head, where a cell can't
+be entered before the snake has moved off it. The step count they give each
+cell is the lowest solution of
+
+    distance = max(1 + lowest neighboring distance, turns until free)
+
+with the head at zero. Here the whole board is relaxed towards that solution
+at once, using the distance array shifted one cell in each direction to find
+the lowest neighbors, until nothing changes. Each pass is a handful of array
+operations and the number of passes is about the length of the longest
+route, rather than one Python step per cell. They return exactly the same
+values as the functions in ai, and raise in the same cases.
+"""
+import numpy as np
+
+import ai
+
+# Distance of cells that haven't been reached.
+UNREACHED = 1 << 30
+
+###############################################################################
+
+def turns_array(width, height, snake, laid_at):
+    """Return a (height, width) array of the turns until each cell is free,
+    zero or less where it already is. |laid_at| is as for ai.flood_distance.
+    """
+    head = snake[0][0] + snake[0][1] * width
+    turns, offset = ai.free_turns(width, height, snake, head, laid_at)
+    return (np.asarray(turns, dtype=np.int32) + offset).reshape(height, width)
+
+def lowest_neighbors(padded, out):
+    """Set |out| to the lowest of the four neighbors of each cell, given the
+    distances in |padded| with a border of UNREACHED around the board.
+    """
+    np.minimum(padded[:-2, 1:-1], padded[2:, 1:-1], out=out)
+    np.minimum(out, padded[1:-1, :-2], out=out)
+    np.minimum(out, padded[1:-1, 2:], out=out)
+
+def distance_field(width, height, snake, laid_at=None):
+    """Return two (height, width) arrays: the distance the flood gives each
+    cell, and the lowest distance next to each cell (the step at which the
+    flood in ai first reaches it). Cells that can't be reached hold
+    UNREACHED in both.
+    """
+    turns = turns_array(width, height, snake, laid_at)
+    padded = np.full((height + 2, width + 2), UNREACHED, dtype=np.int32)
+    distance = padded[1:-1, 1:-1]
+    x, y = snake[0]
+    distance[y, x] = 0
+
+    lowest = np.empty((height, width), dtype=np.int32)
+    relaxed = np.empty((height, width), dtype=np.int32)
+    while True:
+        lowest_neighbors(padded, lowest)
+        np.add(lowest, 1, out=relaxed)
+        np.maximum(relaxed, turns, out=relaxed)
+        np.minimum(relaxed, UNREACHED, out=relaxed)
+        relaxed[y, x] = 0
+        if np.array_equal(relaxed, distance):
+            break
+        distance[...] = relaxed
+
+    lowest_neighbors(padded, lowest)
+    return distance.copy(), lowest
+
+def flood_distance(width, height, target, snake, laid_at=None):
+    """As ai.flood_distance."""
+    assert 0 <= target[0] < width and 0 <= target[1] < height
+
+    if snake[0] == target:
+        return 0
+
+    distance, reached_at = distance_field(width, height, snake, laid_at)
+    x, y = target
+    # The flood in ai gives up once it has passed len(snake) + width + height
+    # steps without reaching the target.
+    if reached_at[y, x] > len(snake) + width + height:
+        raise Exception("Could not reach")
+    return int(distance[y, x])
+
+def navigation_factor(width, height, snake, laid_at=None):
+    """As ai.navigation_factor."""
+    distance, reached_at = distance_field(width, height, snake, laid_at)
+    # The flood in ai gives up if its last step, the one that reaches the
+    # final cell, would pass len(snake) + width + height.
+    x, y = snake[0]
+    reached_at[y, x] = 0
+    if reached_at.max() + 1 > len(snake) + width + height:
+        raise Exception("Could not reach all tiles")
+
+    n = len(snake) - 1
+    return int(distance.sum(dtype=np.int64)) - (n * n + n) // 2
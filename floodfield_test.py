@@ -0,0 +1,51 @@
+import random
+
+import ai
+import floodfield
+from snake import Snake
+
+# The boards from ai_test.
+FLOOD_CASES = [
+    (4, 4, (1,1), [(0,0)]),
+    (4, 4, (0,0), [(0,0), (1,0)]),
+    (4, 4, (1,1), [(0,0), (1,0), (1,1), (1,2), (1,3), (2,3), (3,3)]),
+    (4, 4, (2,3), [(0,0), (1,0), (1,1), (1,2), (1,3), (2,3), (3,3)]),
+]
+
+NAVIGATION_CASES = [
+    (4, 4, [(0,0)]),
+    (4, 4, [(2,2)]),
+    (4, 4, [(2,2), (2,3), (3,3)]),
+    (8, 8, [(0,0), (1,0), (1,1), (1,2), (1,3), (1,4), (1,5), (1,6), (1,7)]),
+    (8, 8, [(0,0), (1,0), (2,0), (3,0), (4,0), (5,0), (6,0), (7,0), (7,1)]),
+]
+
+def test_flood_distance_matches_ai():
+    for case in FLOOD_CASES:
+        assert floodfield.flood_distance(*case) == ai.flood_distance(*case)
+
+def test_navigation_factor_matches_ai():
+    for case in NAVIGATION_CASES:
+        assert floodfield.navigation_factor(*case) == ai.navigation_factor(*case)
+
+def test_distance_field():
+    distance, reached_at = floodfield.distance_field(3, 1, [(0,0), (1,0), (2,0)])
+    # The middle segment is in the way for one turn, so the tail's cell is
+    # entered at step 2 and the middle at step 1.
+    assert distance.tolist() == [[0, 1, 2]]
+    assert reached_at.tolist() == [[1, 0, 1]]
+
+def test_matches_ai_over_games():
+    random.seed(7)
+    for size in [(6, 6), (8, 5), (10, 10)]:
+        game = Snake(*size)
+        while game.get_state() == Snake.PLAYING:
+            snake = game.get_snake_position()
+            laid_at = game.get_laid_at()
+            target = (random.randrange(size[0]), random.randrange(size[1]))
+            assert floodfield.flood_distance(*size, target, snake, laid_at) \
+                == ai.flood_distance(*size, target, snake)
+            assert floodfield.navigation_factor(*size, snake, laid_at) \
+                == ai.navigation_factor(*size, snake)
+            safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+            game.advance(random.choice(safe) if safe else Snake.NORTH)
@@ -0,0 +1,227 @@
+"""Compact binary traces of played games.
+
+A trace file is a stream of records, each starting with a one byte tag. A
+file can hold any number of games one after another:
+
+    H  Game header: width, height, seed and AI name.
+    G  Goal event: the move after which a goal appeared, and its position.
+       The first goal of a game is recorded at move 0.
+    M  A chunk of moves, packed four to a byte as indices into
+       Snake.VALID_DIRECTIONS.
+    X  A move that was not a valid direction (which ends the game).
+    E  End of the game: final state, moves and points.
+
+All integers are little endian.
+"""
+import mmap
+import struct
+
+from snake import Snake
+
+HEADER = struct.Struct('<HHQH')
+GOAL = struct.Struct('<IHH')
+MOVES = struct.Struct('<H')
+END = struct.Struct('<BII')
+
+# Moves buffered before a chunk is written out.
+CHUNK_SIZE = 4096
+
+DIRECTION_CODES = {x: i for i, x in enumerate(Snake.VALID_DIRECTIONS)}
+
+###############################################################################
+
+def pack_moves(codes):
+    packed = bytearray((len(codes) + 3) // 4)
+    for i, code in enumerate(codes):
+        packed[i >> 2] |= code << ((i & 3) * 2)
+    return bytes(packed)
+
+def unpack_moves(data, count):
+    for i in range(count):
+        yield Snake.VALID_DIRECTIONS[(data[i >> 2] >> ((i & 3) * 2)) & 3]
+
+class TraceWriter:
+    """Write games to a binary file object as they are played.
+
+    Usage:
+        writer = TraceWriter(file)
+        writer.start_game(game, 'ai_name')
+        ... game.advance(...) ...
+        writer.finish_game(game)
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.pending = []
+        self.points = None
+
+    def start_game(self, game, ai_name=''):
+        """Write the header for a new game and start recording its moves."""
+        assert self.points is None, 'Already recording a game'
+        name = ai_name.encode('utf-8')
+        self.file.write(b'H')
+        self.file.write(HEADER.pack(game.get_width(), game.get_height(),
+                game.get_seed(), len(name)))
+        self.file.write(name)
+        self.write_goal(game.get_moves(), game.get_goal())
+        self.points = game.get_points()
+        game.set_recorder(self)
+
+    def record_move(self, game, direction):
+        """Called by Snake.advance after each move of a recorded game."""
+        if direction in DIRECTION_CODES:
+            self.pending.append(DIRECTION_CODES[direction])
+            if len(self.pending) >= CHUNK_SIZE:
+                self.flush_moves()
+        else:
+            self.flush_moves()
+            self.file.write(b'X')
+
+        if game.get_points() != self.points:
+            self.points = game.get_points()
+            if game.get_state() == Snake.PLAYING:
+                self.flush_moves()
+                self.write_goal(game.get_moves(), game.get_goal())
+
+    def finish_game(self, game):
+        """Write the end of the game and stop recording it."""
+        self.flush_moves()
+        self.file.write(b'E')
+        self.file.write(END.pack(game.get_state(), game.get_moves(),
+                game.get_points()))
+        self.points = None
+        game.set_recorder(None)
+
+    def write_goal(self, move, goal):
+        self.file.write(b'G')
+        self.file.write(GOAL.pack(move, goal[0], goal[1]))
+
+    def flush_moves(self):
+        if self.pending:
+            self.file.write(b'M')
+            self.file.write(MOVES.pack(len(self.pending)))
+            self.file.write(pack_moves(self.pending))
+            self.pending = []
+
+###############################################################################
+
+def iter_records(data, pos, end):
+    """Yield (tag, offset of the record's contents) for each record between
+    two offsets of a buffer of trace data.
+    """
+    while pos < end:
+        tag = data[pos:pos + 1]
+        pos += 1
+        yield tag, pos
+        if tag == b'M':
+            count, = MOVES.unpack_from(data, pos)
+            pos += MOVES.size + (count + 3) // 4
+        elif tag == b'G':
+            pos += GOAL.size
+        elif tag == b'E':
+            pos += END.size
+        elif tag == b'H':
+            pos += HEADER.size + HEADER.unpack_from(data, pos)[3]
+        elif tag != b'X':
+            raise ValueError('Bad record {!r} at offset {}'.format(tag, pos - 1))
+
+class GameTrace:
+    """A single game in a buffer of trace data, from its header record up to
+    and including its end record. Moves are decoded lazily.
+    """
+
+    def __init__(self, data, offset, end):
+        self.data = data
+        self.offset = offset
+        self.end = end
+
+        self.width, self.height, self.seed, name_length = \
+            HEADER.unpack_from(data, offset + 1)
+        start = offset + 1 + HEADER.size
+        self.ai_name = bytes(data[start:start + name_length]).decode('utf-8')
+        self.body = start + name_length
+        self.state, self.moves, self.points = \
+            END.unpack_from(data, end - END.size)
+
+    def iter_moves(self):
+        """Yield each move of the game in order. A move that was not a valid
+        direction is yielded as None.
+        """
+        for tag, pos in iter_records(self.data, self.body, self.end):
+            if tag == b'M':
+                count, = MOVES.unpack_from(self.data, pos)
+                start = pos + MOVES.size
+                yield from unpack_moves(
+                        self.data[start:start + (count + 3) // 4], count)
+            elif tag == b'X':
+                yield None
+
+    def goals(self):
+        """Return a list of (move number, goal position) events."""
+        result = []
+        for tag, pos in iter_records(self.data, self.body, self.end):
+            if tag == b'G':
+                move, x, y = GOAL.unpack_from(self.data, pos)
+                result.append((move, (x, y)))
+        return result
+
+    def move_at(self, index):
+        """Return a single move, skipping over whole chunks to reach it."""
+        for tag, pos in iter_records(self.data, self.body, self.end):
+            if tag == b'M':
+                count, = MOVES.unpack_from(self.data, pos)
+                if index < count:
+                    byte = self.data[pos + MOVES.size + (index >> 2)]
+                    return Snake.VALID_DIRECTIONS[(byte >> ((index & 3) * 2)) & 3]
+                index -= count
+            elif tag == b'X':
+                if index == 0:
+                    return None
+                index -= 1
+        raise IndexError('Move index out of range')
+
+    def replay(self):
+        """Re-simulate the game, checking it matches the recorded goals and
+        final result. Returns the final Snake.
+        """
+        game = Snake(self.width, self.height, self.seed)
+        goals = [(0, game.get_goal())]
+        for move in self.iter_moves():
+            points = game.get_points()
+            game.advance(move)
+            if game.get_points() != points and game.get_state() == Snake.PLAYING:
+                goals.append((game.get_moves(), game.get_goal()))
+
+        if goals != self.goals() \
+                or (game.get_state(), game.get_moves(), game.get_points()) \
+                    != (self.state, self.moves, self.points):
+            raise ValueError('Trace of seed {} does not match its replay'.format(
+                    self.seed))
+        return game
+
+def iter_games(data):
+    """Yield a GameTrace for each game in a buffer of trace data."""
+    start = 0
+    for tag, pos in iter_records(data, 0, len(data)):
+        if tag == b'E':
+            if data[start:start + 1] != b'H':
+                raise ValueError('Expected a game header at offset {}'.format(start))
+            yield GameTrace(data, start, pos + END.size)
+            start = pos + END.size
+    if start != len(data):
+        raise ValueError('Truncated game at offset {}'.format(start))
+
+def read_traces(path):
+    """Yield a GameTrace for each game in a trace file.
+
+    The file is memory mapped, so only the parts that are looked at are read
+    from disk. The traces are only valid while the generator is open.
+    """
+    with open(path, 'rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            return
+        with data:
+            yield from iter_games(data)
@@ -0,0 +1,78 @@
+import io
+import random
+
+from gametrace import *
+from snake import Snake
+
+def play_and_record(writer, seed, size=6, invalid_at=None):
+    rng = random.Random(seed)
+    game = Snake(size, size, seed)
+    writer.start_game(game, 'random_{}'.format(seed))
+    moves = []
+    while game.get_state() == Snake.PLAYING:
+        safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+        move = rng.choice(safe) if safe else Snake.NORTH
+        if len(moves) == invalid_at:
+            move = (1, 1)
+        game.advance(move)
+        moves.append(move if move in Snake.VALID_DIRECTIONS else None)
+    writer.finish_game(game)
+    return game, moves
+
+def test_pack_moves():
+    codes = [0, 1, 2, 3, 3, 2, 1]
+    packed = pack_moves(codes)
+    assert len(packed) == 2
+    assert [DIRECTION_CODES[x] for x in unpack_moves(packed, len(codes))] == codes
+
+def test_round_trip():
+    buffer = io.BytesIO()
+    writer = TraceWriter(buffer)
+    played = [play_and_record(writer, seed) for seed in range(5)]
+    played.append(play_and_record(writer, 5, invalid_at=3))
+
+    traces = list(iter_games(buffer.getvalue()))
+    assert len(traces) == len(played)
+    for trace, (game, moves) in zip(traces, played):
+        assert trace.seed == game.get_seed()
+        assert trace.width == 6 and trace.height == 6
+        assert trace.ai_name.startswith('random_')
+        assert trace.moves == game.get_moves()
+        assert trace.points == game.get_points()
+        assert trace.state == game.get_state()
+        assert list(trace.iter_moves()) == moves
+        assert trace.move_at(len(moves) - 1) == moves[-1]
+        assert len(trace.goals()) == game.get_points() + \
+            (1 if game.get_state() != Snake.WON else 0)
+        assert trace.replay().get_snake_position() == game.get_snake_position()
+
+    assert list(traces[-1].iter_moves())[-1] is None
+
+def test_long_game_spans_chunks():
+    buffer = io.BytesIO()
+    writer = TraceWriter(buffer)
+    # Circle the middle of the board without scoring.
+    game = Snake(4, 4, 0)
+    game.set_snake_position([(2,2)])
+    game.goal = (0,0)
+    writer.start_game(game)
+    moves = [Snake.NORTH, Snake.EAST, Snake.SOUTH, Snake.WEST] * 3000
+    for move in moves:
+        game.advance(move)
+    writer.finish_game(game)
+
+    trace, = iter_games(buffer.getvalue())
+    assert list(trace.iter_moves()) == moves
+    assert trace.move_at(CHUNK_SIZE + 1) == moves[CHUNK_SIZE + 1]
+
+def test_read_traces(tmp_path):
+    path = tmp_path / 'games.trace'
+    with open(path, 'wb') as file:
+        writer = TraceWriter(file)
+        for seed in range(3):
+            play_and_record(writer, seed)
+    assert [x.seed for x in read_traces(path)] == [0, 1, 2]
+
+    empty = tmp_path / 'empty.trace'
+    empty.write_bytes(b'')
+    assert list(read_traces(empty)) == []
@@ -0,0 +1,213 @@
+"""Tables and path finding for width by height grids, used by the reachability
+checks that run inside nearly every search step of the AIs.
+
+Cells are packed into a single integer, x + y * width, as in Snake's occupancy
+grid, so per-cell data can be held in flat arrays. Positions are converted to
+and from (x, y) tuples only where they enter or leave the API.
+
+Each Board also holds the other per-size tables the game and AIs share: the
+2x2 supercells used by supergrid and supercellerator, and the Zobrist keys
+Snake hashes positions with.
+"""
+
+import random
+
+# Board tables for each board size.
+BOARDS = {}
+
+# Directions in the same order as Snake.VALID_DIRECTIONS.
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+# The ring of supercells around a supercell, clockwise from north.
+RING = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+
+# Order of the neighbors of each supercell: east, west, south then north.
+SUPERCELL_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+class Board:
+    """Precomputed tables for one board size."""
+
+    __slots__ = ['width', 'height', 'positions', 'neighbors', 'adjacent',
+            'steps', 'supercells', 'supercell_neighbors',
+            'supercell_adjacent', 'supercell_rings', 'cell_keys', 'head_keys']
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        cells = range(width * height)
+        # The (x, y) tuple of each cell, shared so no tuples are built when
+        # converting back.
+        self.positions = tuple((cell % width, cell // width) for cell in cells)
+        # For each direction, the cell one step away from each cell, or -1
+        # where that step leaves the board.
+        self.steps = {}
+        for dx, dy in DIRECTIONS:
+            self.steps[(dx, dy)] = tuple(
+                    x + dx + (y + dy) * width
+                    if 0 <= x + dx < width and 0 <= y + dy < height else -1
+                    for x, y in self.positions)
+        # The cells on the board next to each cell, in direction order.
+        self.neighbors = tuple(
+                tuple(self.steps[direction][cell] for direction in DIRECTIONS
+                    if self.steps[direction][cell] >= 0)
+                for cell in cells)
+        # The same neighbors as (x, y) tuples.
+        self.adjacent = tuple(
+                tuple(self.positions[x] for x in self.neighbors[cell])
+                for cell in cells)
+
+        # Supercells are the 2x2 areas with their top left corner at even
+        # (x, y), numbered x // 2 + (y // 2) * (width // 2). Cells in a
+        # leftover odd row or column aren't in any supercell.
+        columns, rows = width // 2, height // 2
+
+        def number(x, y):
+            if 0 <= x < columns and 0 <= y < rows:
+                return x + y * columns
+            return -1
+
+        # The supercell of each cell, or -1.
+        self.supercells = tuple(number(x // 2, y // 2)
+                for x, y in self.positions)
+        # The supercells next to each supercell, in SUPERCELL_DIRECTIONS
+        # order.
+        self.supercell_neighbors = tuple(
+                tuple(number(x + dx, y + dy)
+                    for dx, dy in SUPERCELL_DIRECTIONS
+                    if number(x + dx, y + dy) >= 0)
+                for y in range(rows) for x in range(columns))
+        # For each cell, the same neighbors of its supercell as the (x, y) of
+        # their top left cells (empty outside the supercells).
+        self.supercell_adjacent = tuple(
+                tuple((x % columns * 2, x // columns * 2)
+                    for x in self.supercell_neighbors[supercell])
+                if supercell >= 0 else ()
+                for supercell in self.supercells)
+        # The eight supercells around each supercell in RING order, or -1
+        # where the ring leaves the board.
+        self.supercell_rings = tuple(
+                tuple(number(x + dx, y + dy) for dx, dy in RING)
+                for y in range(rows) for x in range(columns))
+
+        # Random 64 bit keys for Zobrist hashing, one per cell for occupancy
+        # and one per cell for the head. They come from a fixed seed so
+        # hashes agree between processes.
+        rng = random.Random((width << 32) | height)
+        self.cell_keys = tuple(rng.getrandbits(64) for _ in cells)
+        self.head_keys = tuple(rng.getrandbits(64) for _ in cells)
+
+    def cell(self, position):
+        return position[0] + position[1] * self.width
+
+def board(width, height):
+    """Return the shared tables for a board size, building them the first
+    time they are asked for.
+    """
+    tables = BOARDS.get((width, height))
+    if tables is None:
+        tables = Board(width, height)
+        BOARDS[(width, height)] = tables
+    return tables
+
+###############################################################################
+
+def blocked_cells(width, height, blocked):
+    """Build a flat array holding 1 for each cell in the "blocked" collection."""
+    cells = bytearray(width * height)
+    for x, y in blocked:
+        cells[x + y * width] = 1
+    return cells
+
+def meet(neighbors, cells, start, end):
+    """Search outwards from both start and end at once until the two searches
+    meet, expanding a whole layer of the smaller side at a time.
+
+    Returns the pair of touching cells (one found from start, one from end)
+    that lie on a shortest path, along with the parent arrays of both
+    searches, or None if end can't be reached.
+    """
+    size = len(cells)
+    # parents[side][cell] is the cell it was reached from, or -1.
+    parents = ([-1] * size, [-1] * size)
+    depths = ([-1] * size, [-1] * size)
+    parents[0][start] = start
+    parents[1][end] = end
+    depths[0][start] = 0
+    depths[1][end] = 0
+    fronts = [[start], [end]]
+    layer = [0, 0]
+
+    while fronts[0] and fronts[1]:
+        side = 0 if len(fronts[0]) <= len(fronts[1]) else 1
+        own_parents, own_depths = parents[side], depths[side]
+        other_depths = depths[1 - side]
+        depth = layer[side] + 1
+        best = None
+        best_length = 0
+        next_front = []
+        for cell in fronts[side]:
+            for next in neighbors[cell]:
+                if cells[next]:
+                    continue
+                if other_depths[next] >= 0:
+                    length = depth + other_depths[next]
+                    if best is None or length < best_length:
+                        best = (cell, next)
+                        best_length = length
+                    continue
+                if own_depths[next] >= 0:
+                    continue
+                own_parents[next] = cell
+                own_depths[next] = depth
+                next_front.append(next)
+
+        if best is not None:
+            # Every meeting in this layer has been seen, so the shortest one
+            # is a shortest path overall.
+            if side == 1:
+                best = (best[1], best[0])
+            return best, parents
+
+        fronts[side] = next_front
+        layer[side] = depth
+
+    return None
+
+def find_path(width, height, start, end, blocked, reachable_only=False):
+    """Find a shortest path from start to end that doesn't pass through any
+    cell in the "blocked" collection. Start and end may be blocked.
+
+    Returns the list of moves from start to end, or None if there is no such
+    path.
+
+    Optional keyword arugments:
+    reachable_only -- If true, stop as soon as a path is known to exist and
+        return an empty list instead of building it.
+    """
+    cells = blocked_cells(width, height, blocked)
+    start_cell = start[0] + start[1] * width
+    end_cell = end[0] + end[1] * width
+    cells[start_cell] = 0
+    cells[end_cell] = 0
+    if start_cell == end_cell:
+        return []
+
+    found = meet(board(width, height).neighbors, cells, start_cell, end_cell)
+    if found is None:
+        return None
+    if reachable_only:
+        return []
+
+    (from_start, from_end), (start_parents, end_parents) = found
+    route = [from_start]
+    while route[-1] != start_cell:
+        route.append(start_parents[route[-1]])
+    route.reverse()
+    route.append(from_end)
+    while route[-1] != end_cell:
+        route.append(end_parents[route[-1]])
+
+    moves = []
+    for a, b in zip(route, route[1:]):
+        moves.append((b % width - a % width, b // width - a // width))
+    return moves
@@ -0,0 +1,96 @@
+import random
+
+from grid import *
+
+def follow(start, moves):
+    position = start
+    for move in moves:
+        position = (position[0] + move[0], position[1] + move[1])
+        yield position
+
+def test_board():
+    tables = board(3, 2)
+    assert board(3, 2) is tables
+    assert tables.positions == ((0,0), (1,0), (2,0), (0,1), (1,1), (2,1))
+    assert tables.cell((1,1)) == 4
+    # North, south, west then east, skipping steps off the board.
+    assert tables.neighbors[0] == (3, 1)
+    assert tables.neighbors[4] == (1, 3, 5)
+    assert tables.adjacent[4] == ((1,0), (0,1), (2,1))
+    assert tables.steps[(0,-1)][4] == 1
+    assert tables.steps[(1,0)][2] == -1
+    assert tables.steps[(0,1)][5] == -1
+
+def test_board_supercells():
+    tables = board(5, 4)
+    # The last column is left out of the supercells.
+    assert tables.supercells == (0, 0, 1, 1, -1,
+                                 0, 0, 1, 1, -1,
+                                 2, 2, 3, 3, -1,
+                                 2, 2, 3, 3, -1)
+    # East, west, south then north.
+    assert tables.supercell_neighbors[0] == (1, 2)
+    assert tables.supercell_neighbors[3] == (2, 1)
+    assert tables.supercell_adjacent[12] == ((0,2), (2,0))
+    assert tables.supercell_adjacent[4] == ()
+    assert tables.supercell_rings[3] == (1, -1, -1, -1, -1, -1, 2, 0)
+
+def test_board_zobrist_keys():
+    tables = board(6, 6)
+    keys = tables.cell_keys + tables.head_keys
+    assert len(set(keys)) == len(keys) == 72
+    # Built from a fixed seed, so they don't depend on the cache.
+    assert Board(6, 6).cell_keys == tables.cell_keys
+
+def test_blocked_cells():
+    assert blocked_cells(3, 2, [(0,0), (2,1)]) == bytearray([1, 0, 0, 0, 0, 1])
+
+def test_find_path():
+    assert find_path(4, 4, (0,0), (3,0), []) == [(1,0), (1,0), (1,0)]
+    assert len(find_path(4, 4, (0,0), (3,3), [])) == 6
+    assert find_path(4, 4, (0,0), (3,0), [(2,0), (2,1), (2,2), (2,3)]) is None
+    assert find_path(4, 4, (1,1), (1,1), []) == []
+
+    # Start and end may be blocked, as the snake's head and tail are.
+    assert find_path(3, 1, (0,0), (2,0), [(0,0), (2,0)]) == [(1,0), (1,0)]
+
+    # Going around a wall.
+    walls = [(1,0), (1,1), (1,2)]
+    path = find_path(3, 4, (0,0), (2,0), walls)
+    assert len(path) == 8
+    assert list(follow((0,0), path))[-1] == (2,0)
+    assert not set(follow((0,0), path)) & set(walls)
+
+def test_find_path_reachable_only():
+    assert find_path(4, 4, (0,0), (3,3), [], reachable_only=True) == []
+    assert find_path(4, 4, (0,0), (3,0), [(2,0), (2,1), (2,2), (2,3)],
+            reachable_only=True) is None
+
+def test_find_path_is_shortest():
+    rng = random.Random(0)
+    for _ in range(200):
+        width, height = rng.randint(1, 8), rng.randint(1, 8)
+        blocked = {(rng.randrange(width), rng.randrange(height))
+                for _ in range(rng.randint(0, width * height // 2))}
+        start = (rng.randrange(width), rng.randrange(height))
+        end = (rng.randrange(width), rng.randrange(height))
+        open_cells = {(x, y) for x in range(width) for y in range(height)}
+        open_cells -= blocked - {start, end}
+
+        # Plain breadth first search for the expected length.
+        distances = {start: 0}
+        fringe = [start]
+        for position in fringe:
+            for move in [(0,-1), (0,1), (-1,0), (1,0)]:
+                next = (position[0] + move[0], position[1] + move[1])
+                if next in open_cells and next not in distances:
+                    distances[next] = distances[position] + 1
+                    fringe.append(next)
+
+        path = find_path(width, height, start, end, blocked)
+        if end not in distances:
+            assert path is None
+            continue
+        assert len(path) == distances[end]
+        assert set(follow(start, path)) <= open_cells
+        assert list(follow(start, path))[-1:] == ([end] if path else [])
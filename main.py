@@ -1,6 +1,7 @@
-import pygame
 import time
 
+import render
+import runner
 from snake import Snake
 from ai import *
 from supercellerator import ai_supercellerator_v1
@@ -36,10 +37,6 @@ from supercellerator import ai_supercellerator_v1
 
 ###############################################################################
 
-pygame.init()
-
-###############################################################################
-
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 800
 
@@ -50,14 +47,13 @@ DELAY = 80
 
 ###############################################################################
 
-screen = pygame.display.set_mode([WINDOW_WIDTH,WINDOW_HEIGHT])
-pygame.display.set_caption("Snake")
+renderer = render.PygameRenderer(WINDOW_WIDTH, WINDOW_HEIGHT)
 
 snake_game = Snake(GAME_WIDTH, GAME_HEIGHT)
 
 # Debug impossible situation
 # snake_game.goal = (0, 0)
-# snake_game.snake_position = deque([
+# snake_game.set_snake_position([
 #     (7,7),
 #     (6,7),
 #     (6,6),
@@ -88,7 +84,7 @@ snake_game = Snake(GAME_WIDTH, GAME_HEIGHT)
 
 # Debug hard situation
 # snake_game.goal = (0, 7)
-# snake_game.snake_position = deque([
+# snake_game.set_snake_position([
 #     (3,4),
 #     (3,3),
 #     (3,2),
@@ -128,15 +124,12 @@ running = True
 printed_result = False
 last_tick = 0
 
-snake_game.render(screen, WINDOW_WIDTH, WINDOW_HEIGHT)
-pygame.display.flip()
+renderer.render(snake_game)
 
-while snake_game.get_state() == Snake.PLAYING:
-    snake_game.advance(ai_supercellerator_v1(snake_game))
-    if snake_game.get_state() == Snake.WON:
-        print('Victory in ' + str(snake_game.get_moves()) + ' moves!')
-    elif snake_game.get_state() == Snake.DIED:
-        print('Snake died')
+if runner.play(snake_game, ai_supercellerator_v1) == 'won':
+    print('Victory in ' + str(snake_game.get_moves()) + ' moves!')
+else:
+    print('Snake died')
 
 # while running:
 #     for event in pygame.event.get():
@@ -156,7 +149,6 @@ while snake_game.get_state() == Snake.PLAYING:
 #             print('Snake died')
 #         printed_result = True
 
-#     snake_game.render(screen, WINDOW_WIDTH, WINDOW_HEIGHT)
-#     pygame.display.flip()
+#     renderer.render(snake_game)
 
-pygame.quit()
\ No newline at end of file
+renderer.close()
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Render backends for showing a game of snake.
+
+Every backend has a render(game) method that shows the current state of a
+game and a close() method. pygame is only imported when a PygameRenderer is
+created, so headless code never pays for it.
+"""
+import sys
+
+import common
+from snake import Snake
+
+class NullRenderer:
+    """Draws nothing. For headless runs that still expect a renderer."""
+
+    def render(self, game):
+        pass
+
+    def close(self):
+        pass
+
+class TerminalRenderer:
+    """Draws the board with ANSI escape codes on a terminal."""
+
+    EMPTY = '\x1b[90m.\x1b[0m'
+    HEAD = '\x1b[92m@\x1b[0m'
+    BODY = '\x1b[32mo\x1b[0m'
+    GOAL = '\x1b[91m*\x1b[0m'
+
+    CLEAR = '\x1b[H\x1b[2J'
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+
+    def render(self, game):
+        rows = [[self.EMPTY] * game.get_width() for _ in range(game.get_height())]
+        for pos in game.get_snake_position():
+            rows[pos[1]][pos[0]] = self.BODY
+        head = game.get_snake_head()
+        rows[head[1]][head[0]] = self.HEAD
+        goal = game.get_goal()
+        if goal is not None and game.get_state() == Snake.PLAYING:
+            rows[goal[1]][goal[0]] = self.GOAL
+
+        status = 'points {}  moves {}'.format(game.get_points(), game.get_moves())
+        if game.get_state() == Snake.WON:
+            status += '  You Win'
+        elif game.get_state() == Snake.DIED:
+            status += '  You Lose'
+
+        self.out.write(self.CLEAR
+                + '\n'.join(' '.join(row) for row in rows)
+                + '\n' + status + '\n')
+        self.out.flush()
+
+    def close(self):
+        pass
+
+class PygameRenderer:
+    """Draws the game in a pygame window.
+
+    After the first frame only the cells that changed since the previous
+    frame are repainted and pushed to the display: the new head and its
+    connector, the vacated tail and the old and new goals. Everything is
+    redrawn when the window is resized, the game ends, or frames are skipped.
+    """
+
+    GOAL = (255,0,0)
+    SNAKE_COLOR = (0, 255, 0)
+    SNAKE_GAP_COLOR = (127, 200, 127)
+    SNAKE_GAP_PORTION = 0.1
+
+    BACKGROUND_COLOR = (50, 50, 50)
+    WIN_TEXT_COLOR = (255, 0, 0)
+    LOST_TEXT_COLOR = (255, 0, 0)
+
+    def __init__(self, width, height, caption='Snake'):
+        import pygame
+        self.pygame = pygame
+
+        pygame.init()
+        self.screen = pygame.display.set_mode([width, height])
+        pygame.display.set_caption(caption)
+
+        self.font = pygame.font.SysFont('timesnewroman',  30)
+        self.win_text = self.font.render("You Win", True, self.WIN_TEXT_COLOR)
+        self.lose_text = self.font.render("You Lose", True, self.LOST_TEXT_COLOR)
+
+        # What was drawn last frame: (game, moves, screen size, tail, goal,
+        # snake length), or None to force a full redraw.
+        self.last_frame = None
+
+    def render(self, game):
+        body = game.get_snake_position()
+        size = self.screen.get_size()
+        last = self.last_frame
+        self.last_frame = (game, game.get_moves(), size, body[-1],
+                game.get_goal(), len(body))
+
+        # The first couple of moves unstack the starting segments, and a head
+        # following straight into the old tail cell leaves nothing to clear;
+        # neither is worth handling incrementally.
+        if last is None or last[0] is not game or last[2] != size \
+                or game.get_moves() != last[1] + 1 or game.get_moves() < 3 \
+                or game.get_state() != Snake.PLAYING or body[0] == last[3]:
+            self.draw_full(self.screen, game)
+            self.pygame.display.flip()
+            return
+
+        _, _, _, old_tail, old_goal, old_length = last
+        screen = self.screen
+        cell_size = self.cell_size(screen, game)
+        dirty = []
+
+        if len(body) == old_length:
+            # The tail moved on: clear its cell and the connector to the new
+            # tail, then patch up the new tail.
+            dirty.append(self.clear_cell(screen, old_tail, cell_size))
+            dirty.append(self.clear_connector(screen, old_tail, body[-1], cell_size))
+            self.draw_pip(screen, body[-1], cell_size)
+            self.draw_connector(screen, body[-1], body[-2], cell_size)
+
+        if game.get_goal() != old_goal:
+            # The old goal was eaten and is now under the head.
+            dirty.append(self.clear_cell(screen, old_goal, cell_size))
+            dirty.append(self.draw_goal(screen, game.get_goal(), cell_size))
+
+        dirty.append(self.draw_pip(screen, body[0], cell_size))
+        dirty.append(self.draw_connector(screen, body[1], body[0], cell_size))
+
+        self.pygame.display.update(dirty)
+
+    def cell_size(self, surface, game):
+        width, height = surface.get_size()
+        return min(width / game.get_width(), height / game.get_height())
+
+    def draw_full(self, surface, game):
+        """Redraw the whole game onto a surface."""
+        surface.fill(self.BACKGROUND_COLOR)
+        cell_size = self.cell_size(surface, game)
+
+        last = None
+        for pip in game.get_snake_position():
+            self.draw_pip(surface, pip, cell_size)
+            if last and last != pip:
+                self.draw_connector(surface, pip, last, cell_size)
+            last = pip
+
+        self.draw_goal(surface, game.get_goal(), cell_size)
+
+        if game.get_state() == Snake.DIED:
+            surface.blit(self.lose_text, (100, 100))
+
+        if game.get_state() == Snake.WON:
+            surface.blit(self.win_text, (100, 100))
+
+    def draw_pip(self, surface, pos, cell_size):
+        gap = self.SNAKE_GAP_PORTION * cell_size
+        return self.pygame.draw.rect(surface, self.SNAKE_COLOR, [
+                    cell_size * pos[0] + gap,
+                    cell_size * pos[1] + gap,
+                    cell_size - 2 * gap,
+                    cell_size - 2 * gap,
+                ])
+
+    def connector_rect(self, a, b, cell_size):
+        """The bar joining the pips of two adjacent snake segments."""
+        gap = self.SNAKE_GAP_PORTION * cell_size
+        middle = common.average_elements(a, b)
+        w = cell_size - 2 * gap if a[0] == b[0] else gap * 2 + 2
+        h = gap * 2 + 2 if a[0] == b[0] else cell_size - 2 * gap
+        x = middle[0] * cell_size + cell_size / 2 - w / 2
+        y = middle[1] * cell_size + cell_size / 2 - h / 2
+        return [x, y, w, h]
+
+    def draw_connector(self, surface, a, b, cell_size):
+        return self.pygame.draw.rect(surface, self.SNAKE_GAP_COLOR,
+                self.connector_rect(a, b, cell_size))
+
+    def clear_connector(self, surface, a, b, cell_size):
+        return self.pygame.draw.rect(surface, self.BACKGROUND_COLOR,
+                self.connector_rect(a, b, cell_size))
+
+    def draw_goal(self, surface, pos, cell_size):
+        return self.pygame.draw.ellipse(surface, self.GOAL,
+                [cell_size * pos[0], cell_size * pos[1], cell_size, cell_size])
+
+    def clear_cell(self, surface, pos, cell_size):
+        return self.pygame.draw.rect(surface, self.BACKGROUND_COLOR,
+                [cell_size * pos[0], cell_size * pos[1], cell_size, cell_size])
+
+    def close(self):
+        self.pygame.quit()
+
+RENDERERS = {
+    'null': NullRenderer,
+    'terminal': TerminalRenderer,
+    'pygame': PygameRenderer,
+}
+
+def make_renderer(name, *args, **kwargs):
+    """Create a render backend by name: 'null', 'terminal' or 'pygame'."""
+    return RENDERERS[name](*args, **kwargs)
@@ -0,0 +1,73 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from render import *
+from snake import Snake
+
+def test_headless_imports_skip_pygame():
+    # Run in a fresh interpreter since pytest may already have pygame loaded.
+    subprocess.run([sys.executable, '-c',
+            'import sys, snake, ai, supercellerator, runner, render; '
+            'assert "pygame" not in sys.modules'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+def test_null_renderer():
+    renderer = make_renderer('null')
+    renderer.render(Snake(4, 4))
+    renderer.close()
+
+def test_terminal_renderer():
+    out = io.StringIO()
+    game = Snake(4, 4)
+    game.set_snake_position([(1,1), (1,2)])
+    game.goal = (3,0)
+    TerminalRenderer(out).render(game)
+
+    text = out.getvalue()
+    assert text.startswith(TerminalRenderer.CLEAR)
+    rows = text[len(TerminalRenderer.CLEAR):].split('\n')
+    assert rows[0].split(' ')[3] == TerminalRenderer.GOAL
+    assert rows[1].split(' ')[1] == TerminalRenderer.HEAD
+    assert rows[2].split(' ')[1] == TerminalRenderer.BODY
+    assert rows[3].split(' ')[0] == TerminalRenderer.EMPTY
+    assert rows[4] == 'points 0  moves 0'
+
+    game.advance(None)
+    out.truncate(0)
+    TerminalRenderer(out).render(game)
+    assert 'You Lose' in out.getvalue()
+
+def test_pygame_renderer(monkeypatch):
+    pytest.importorskip('pygame')
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    renderer = make_renderer('pygame', 200, 200)
+    game = Snake(10, 10, 0)
+    game.advance(Snake.NORTH)
+    renderer.render(game)
+    assert renderer.screen.get_at((110, 90))[:3] == PygameRenderer.SNAKE_COLOR
+    renderer.close()
+
+def test_pygame_incremental_matches_full_redraw(monkeypatch):
+    pygame = pytest.importorskip('pygame')
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    from supercellerator import ai_supercellerator_v1
+
+    updates = []
+    monkeypatch.setattr(pygame.display, 'update', updates.append)
+    for size in [(230, 230), (200, 170)]:
+        renderer = PygameRenderer(*size)
+        expected = pygame.Surface(renderer.screen.get_size())
+        game = Snake(8, 8, 3)
+        while game.get_state() == Snake.PLAYING:
+            game.advance(ai_supercellerator_v1(game))
+            renderer.render(game)
+            renderer.draw_full(expected, game)
+            assert pygame.image.tobytes(renderer.screen, 'RGB') \
+                == pygame.image.tobytes(expected, 'RGB'), game.get_moves()
+        assert game.get_state() == Snake.WON
+        renderer.close()
+    assert len(updates) > 500
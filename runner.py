@@ -0,0 +1,175 @@
+"""Headless runner for playing many games with one or more AIs.
+
+Games are spread across a process pool and each result is printed as soon as
+it finishes, followed by throughput and a summary for each AI. For example:
+
+    python runner.py ai_supercellerator_v1 ai_simple_explore \
+        --size 10x10 --seeds 0:50 --workers 4
+"""
+import argparse
+import collections
+import concurrent.futures
+import io
+import os
+import time
+
+import ai
+import supercellerator
+from gametrace import TraceWriter
+from snake import Snake
+
+AI_MODULES = [ai, supercellerator]
+
+# |trace| holds the game in gametrace format when it was asked for.
+GameResult = collections.namedtuple('GameResult', [
+    'ai_name', 'width', 'height', 'seed', 'outcome', 'moves', 'points',
+    'seconds', 'trace'], defaults=[None])
+
+###############################################################################
+
+def list_ais():
+    """Return the names of all the AIs that can be run."""
+    names = set()
+    for module in AI_MODULES:
+        names.update(x for x in dir(module) if x.startswith('ai_'))
+    return sorted(names)
+
+def find_ai(name):
+    """Look up an AI function by name."""
+    if name.startswith('ai_'):
+        for module in AI_MODULES:
+            if hasattr(module, name):
+                return getattr(module, name)
+    raise ValueError('Unknown AI "{}", expected one of: {}'.format(
+            name, ', '.join(list_ais())))
+
+def play(game, play_move, stall_limit=0):
+    """Play a game to the end. If |stall_limit| is provided, give up once
+    that many moves pass without scoring a point.
+
+    Returns 'won', 'died' or 'stalled'.
+    """
+    while game.get_state() == Snake.PLAYING:
+        if stall_limit > 0 and game.get_moves_since_point() >= stall_limit:
+            return 'stalled'
+        game.advance(play_move(game))
+    return 'won' if game.get_state() == Snake.WON else 'died'
+
+def play_game(ai_name, width, height, seed, stall_limit=0, trace=False):
+    """Play a single game from a seed and return a GameResult."""
+    play_move = find_ai(ai_name)
+    game = Snake(width, height, seed)
+
+    if trace:
+        buffer = io.BytesIO()
+        writer = TraceWriter(buffer)
+        writer.start_game(game, ai_name)
+
+    start = time.perf_counter()
+    outcome = play(game, play_move, stall_limit)
+    seconds = time.perf_counter() - start
+
+    if trace:
+        writer.finish_game(game)
+
+    return GameResult(ai_name, width, height, seed, outcome,
+            game.get_moves(), game.get_points(), seconds,
+            buffer.getvalue() if trace else None)
+
+###############################################################################
+
+def run_games(ai_names, width, height, seeds, workers, stall_limit=0,
+        trace=False):
+    """Play every AI against every seed across a process pool. Yields
+    GameResults in the order they finish.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(play_game, name, width, height, seed, stall_limit,
+                trace)
+            for name in ai_names
+            for seed in seeds]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+def format_result(result):
+    return '{:<45} seed {:>6}  {:<8} moves {:>7}  points {:>5}  {:>8.2f}s'.format(
+            result.ai_name, result.seed, result.outcome, result.moves,
+            result.points, result.seconds)
+
+def summarize(results, wall_seconds):
+    """Print throughput and per AI results."""
+    games = len(results)
+    moves = sum(x.moves for x in results)
+    print()
+    print('{} games, {} moves in {:.2f}s: {:.2f} games/sec, {:.0f} moves/sec'.format(
+            games, moves, wall_seconds,
+            games / wall_seconds, moves / wall_seconds))
+
+    by_ai = collections.defaultdict(list)
+    for result in results:
+        by_ai[result.ai_name].append(result)
+
+    print()
+    print('{:<45} {:>6} {:>6} {:>6} {:>8} {:>10} {:>10} {:>10}'.format(
+            'ai', 'won', 'died', 'stall', 'games', 'points', 'moves',
+            'sec/game'))
+    for name, games in sorted(by_ai.items()):
+        outcomes = collections.Counter(x.outcome for x in games)
+        print('{:<45} {:>6} {:>6} {:>6} {:>8} {:>10.1f} {:>10.1f} {:>10.3f}'.format(
+                name, outcomes['won'], outcomes['died'], outcomes['stalled'],
+                len(games),
+                sum(x.points for x in games) / len(games),
+                sum(x.moves for x in games) / len(games),
+                sum(x.seconds for x in games) / len(games)))
+
+def parse_size(value):
+    width, _, height = value.partition('x')
+    return int(width), int(height or width)
+
+def parse_seeds(value):
+    """Parse either a count ("100") or a range ("100:200") of seeds."""
+    if ':' in value:
+        start, end = value.split(':')
+        return range(int(start), int(end))
+    return range(int(value))
+
+def main():
+    parser = argparse.ArgumentParser(description='Play snake AIs headlessly.')
+    parser.add_argument('ai', nargs='+', help='Names of the AIs to play.')
+    parser.add_argument('--size', type=parse_size, default=(30, 30),
+            help='Board size as WIDTHxHEIGHT. (default 30x30)')
+    parser.add_argument('--seeds', type=parse_seeds, default=range(10),
+            help='Seed count or START:END range. (default 10)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+            help='Number of worker processes. (default one per CPU)')
+    parser.add_argument('--stall-limit', type=int, default=0,
+            help='Give up after this many moves without a point. '
+                '(default: twice the board area)')
+    parser.add_argument('--trace', metavar='PATH',
+            help='Append a trace of every game to this file.')
+    args = parser.parse_args()
+
+    for name in args.ai:
+        try:
+            find_ai(name)
+        except ValueError as e:
+            parser.error(str(e))
+    width, height = args.size
+    stall_limit = args.stall_limit or 2 * width * height
+
+    trace_file = open(args.trace, 'ab') if args.trace else None
+    start = time.perf_counter()
+    results = []
+    for result in run_games(args.ai, width, height, args.seeds, args.workers,
+            stall_limit, trace_file is not None):
+        print(format_result(result), flush=True)
+        if trace_file:
+            trace_file.write(result.trace)
+        results.append(result._replace(trace=None))
+    summarize(results, time.perf_counter() - start)
+    if trace_file:
+        trace_file.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+from runner import *
+
+import pytest
+
+def test_find_ai():
+    assert find_ai('ai_hamiltonian') is ai.ai_hamiltonian
+    assert find_ai('ai_supercellerator_v1') is supercellerator.ai_supercellerator_v1
+    assert 'ai_simple_explore' in list_ais()
+    with pytest.raises(ValueError):
+        find_ai('adjacent')
+
+def test_play_game():
+    result = play_game('ai_supercellerator_v1', 6, 6, 0)
+    assert result.outcome == 'won'
+    assert result.points > 0
+    assert play_game('ai_supercellerator_v1', 6, 6, 0).moves == result.moves
+
+    assert play_game('ai_run_right', 6, 6, 0).outcome == 'died'
+
+def test_play_stalls():
+    game = Snake(4, 4)
+    # Circle the middle of the board forever.
+    loop = {(2,2): Snake.NORTH, (2,1): Snake.WEST, (1,1): Snake.SOUTH, (1,2): Snake.EAST}
+    game.goal = (0,0)
+    assert play(game, lambda x: loop[x.get_snake_head()], stall_limit=20) == 'stalled'
+    assert game.get_moves() == 20
+
+def test_parse_arguments():
+    assert parse_size('10x12') == (10, 12)
+    assert parse_size('8') == (8, 8)
+    assert parse_seeds('5') == range(5)
+    assert parse_seeds('5:10') == range(5, 10)
+
+def test_play_game_trace():
+    import gametrace
+
+    result = play_game('ai_supercellerator_v1', 6, 6, 1, trace=True)
+    trace, = gametrace.iter_games(result.trace)
+    assert trace.ai_name == 'ai_supercellerator_v1'
+    assert trace.moves == result.moves
+    assert trace.replay().get_points() == result.points
+    assert play_game('ai_supercellerator_v1', 6, 6, 1).trace is None
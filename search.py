@@ -1,8 +1,159 @@
-from queue import PriorityQueue
+import heapq
+import math
+import pickle
+import time
 from collections import deque
 
+class HeapFrontier:
+    """A binary heap of search states. States with equal priority come out
+    in the order they were added.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, priority, item):
+        heapq.heappush(self.heap, (priority, self.counter, item))
+        self.counter += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+class BucketFrontier:
+    """A bucket queue of search states, with one FIFO bucket per priority.
+
+    Push and pop are O(1) (amortized over the range of priorities), but
+    priorities must be small non-negative integers. With unit step costs and
+    integer heuristics, A* f-values always are.
+    """
+
+    def __init__(self):
+        self.buckets = []
+        self.lowest = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority, item):
+        if priority < 0 or priority != int(priority):
+            raise ValueError('Bucket priorities must be non-negative integers')
+        priority = int(priority)
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque())
+        self.buckets[priority].append(item)
+        self.lowest = min(self.lowest, priority)
+        self.size += 1
+
+    def pop(self):
+        if not self.size:
+            raise IndexError('pop from an empty frontier')
+        while not self.buckets[self.lowest]:
+            self.lowest += 1
+        self.size -= 1
+        return self.buckets[self.lowest].popleft()
+
+FRONTIERS = {
+    'heap': HeapFrontier,
+    'bucket': BucketFrontier,
+}
+
+class SearchStats:
+    """Counters filled in by a search when passed as its |stats| argument.
+
+    The same object can be passed to several searches to add them up.
+    """
+
+    def __init__(self):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = 0
+        # Subtrees skipped because their upper bound couldn't beat the best.
+        self.pruned = 0
+        self.peak_fringe = 0
+        self.max_depth = 0
+        # Length of the path found by the last search, if it found one.
+        self.solution_depth = None
+        self.heuristic_seconds = 0.0
+        self.list_moves_seconds = 0.0
+        self.apply_move_seconds = 0.0
+
+    def timed(self, callback, attribute):
+        """Wrap a search callback to add the time spent in it to one of the
+        *_seconds attributes.
+        """
+        def timed_callback(*args):
+            start = time.perf_counter()
+            result = callback(*args)
+            setattr(self, attribute,
+                    getattr(self, attribute) + time.perf_counter() - start)
+            return result
+        return timed_callback
+
+    def add(self, other, depth_offset=0):
+        """Add in the stats of a search of a subtree that started
+        |depth_offset| moves from the root.
+        """
+        self.generated += other.generated
+        self.expanded += other.expanded
+        self.duplicates += other.duplicates
+        self.pruned += other.pruned
+        self.peak_fringe = max(self.peak_fringe, other.peak_fringe)
+        self.max_depth = max(self.max_depth, other.max_depth + depth_offset)
+        self.heuristic_seconds += other.heuristic_seconds
+        self.list_moves_seconds += other.list_moves_seconds
+        self.apply_move_seconds += other.apply_move_seconds
+
+    def branching_factor(self):
+        """Return the effective branching factor: the b for which a uniform
+        tree as deep as the solution (or the search) holds as many states as
+        were generated, i.e. 1 + generated = 1 + b + b^2 + ... + b^depth.
+        """
+        depth = self.solution_depth or self.max_depth
+        if depth == 0 or self.generated == 0:
+            return 0.0
+
+        def tree_size(b):
+            return sum(b ** x for x in range(1, depth + 1))
+
+        # b^depth alone can't pass the number generated, which bounds b and
+        # keeps the powers below from overflowing on deep searches.
+        low, high = 0.0, self.generated ** (1 / depth)
+        for _ in range(100):
+            middle = (low + high) / 2
+            if tree_size(middle) < self.generated:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    def __str__(self):
+        return ('generated {} expanded {} duplicates {} peak fringe {} '
+                'pruned {} max depth {} branching {:.2f} | heuristic {:.3f}s '
+                'list_moves {:.3f}s apply_move {:.3f}s').format(
+                self.generated, self.expanded, self.duplicates,
+                self.peak_fringe, self.pruned, self.max_depth,
+                self.branching_factor(),
+                self.heuristic_seconds, self.list_moves_seconds,
+                self.apply_move_seconds)
+
+def get_deadline(deadline, time_budget):
+    """Combine the deadline and time_budget search arguments into a single
+    time.perf_counter() value, or None if neither was given.
+    """
+    if time_budget is not None:
+        budget_end = time.perf_counter() + time_budget
+        if deadline is None or budget_end < deadline:
+            deadline = budget_end
+    return deadline
+
 def original_a_star_search(*, start_state, heuristic, list_moves, apply_move,
-        copy_interval=-1, search_limit=0):
+        copy_interval=-1, search_limit=0, frontier='heap', state_key=None,
+        stats=None):
     """Perform an A* search through a state space.
     
     Assumes that the cost of each move is one.
@@ -25,23 +176,73 @@ def original_a_star_search(*, start_state, heuristic, list_moves, apply_move,
         This has no impact on output and is purely a performance optimiziation.
     search_limit -- If provided, search no more than this number of state before
         returning None.
+    frontier -- Which FRONTIERS queue to keep unexplored states in. 'heap'
+        (default) takes any priorities, 'bucket' needs integer heuristics.
+    state_key -- Given a state return a hashable key identifying it. If
+        provided, a state is only searched again if it is reached by a
+        shorter path than before.
+    stats -- A SearchStats to record the work done in. The callbacks are
+        only timed when this is given.
     """
+    return original_a_star_search_timed(start_state=start_state,
+            heuristic=heuristic, list_moves=list_moves, apply_move=apply_move,
+            copy_interval=copy_interval, search_limit=search_limit,
+            frontier=frontier, state_key=state_key, stats=stats)[0]
+
+def original_a_star_search_timed(*, start_state, heuristic, list_moves,
+        apply_move, copy_interval=-1, search_limit=0, frontier='heap',
+        state_key=None, stats=None, deadline=None, time_budget=None):
+    """As original_a_star_search, but stops when time runs out.
+
+    Always returns a tuple of (path, partial). When time runs out partial is
+    True, and path leads to the state with the lowest heuristic found so far
+    (or is None if no state was reached).
+
+    Optional keyword arugments:
+    deadline -- A time.perf_counter() value to stop searching at.
+    time_budget -- A number of seconds to stop searching after.
+    """
+
+    if stats is not None:
+        heuristic = stats.timed(heuristic, 'heuristic_seconds')
+        list_moves = stats.timed(list_moves, 'list_moves_seconds')
+        apply_move = stats.timed(apply_move, 'apply_move_seconds')
 
-    fringe = PriorityQueue()
+    deadline = get_deadline(deadline, time_budget)
+    # Path to the state with the lowest heuristic, for when time runs out.
+    closest_value = None
+    closest_path = None
+
+    # Shortest path length found to each state key.
+    best_cost = {}
+    start_key = None
+    if state_key:
+        start_key = state_key(start_state)
+        best_cost[start_key] = 0
+
+    fringe = FRONTIERS[frontier]()
     # Fringe contents are a tuple with:
-    # (ranking, counter, move_list, num_applied_moves, base_state)
+    # (move_list, num_applied_moves, base_state, key)
     counter = 0
-    fringe.put((0, counter, [], 0, start_state))
+    fringe.push(0, ([], 0, start_state, start_key))
 
-    while not fringe.empty():
+    while fringe:
         counter = counter + 1
         if search_limit > 0 and counter > search_limit:
-            return None
+            return None, False
+        if deadline is not None and time.perf_counter() >= deadline:
+            return closest_path, True
 
-        node = fringe.get()
-        current_path = node[2]
-        num_applied_moves = node[3]
-        state = node[4]
+        node = fringe.pop()
+        current_path = node[0]
+        num_applied_moves = node[1]
+        state = node[2]
+
+        # Skip states that were reached more cheaply since being queued.
+        if state_key and best_cost[node[3]] < len(current_path):
+            if stats is not None:
+                stats.duplicates += 1
+            continue
 
         # Re-construct the current state
         for move in current_path[num_applied_moves::]:
@@ -51,6 +252,8 @@ def original_a_star_search(*, start_state, heuristic, list_moves, apply_move,
             continue
         
         possible_moves = list_moves(state)
+        if stats is not None:
+            stats.expanded += 1
 
         for move in possible_moves:
             cost = len(current_path) + 1
@@ -58,19 +261,284 @@ def original_a_star_search(*, start_state, heuristic, list_moves, apply_move,
             new_state = apply_move(state, move)
             if new_state is None:
                 continue
+            if stats is not None:
+                stats.generated += 1
+                stats.max_depth = max(stats.max_depth, cost)
+
+            key = None
+            if state_key:
+                key = state_key(new_state)
+                if best_cost.get(key, cost + 1) <= cost:
+                    if stats is not None:
+                        stats.duplicates += 1
+                    continue
+                best_cost[key] = cost
+
             heuristic_value = heuristic(new_state)
 
             if heuristic_value == 0:
-                return new_path
+                if stats is not None:
+                    stats.solution_depth = cost
+                return new_path, False
+            if deadline is not None and (closest_value is None
+                    or heuristic_value < closest_value):
+                closest_value = heuristic_value
+                closest_path = new_path
             
             if copy_interval >= 0 and cost - num_applied_moves > copy_interval:
-                fringe.put((cost + heuristic_value, counter, new_path, len(new_path), new_state))
+                fringe.push(cost + heuristic_value, (new_path, len(new_path), new_state, key))
             else:
-                fringe.put((cost + heuristic_value, counter, new_path, num_applied_moves, node[4]))
+                fringe.push(cost + heuristic_value, (new_path, num_applied_moves, node[2], key))
+
+        if stats is not None:
+            stats.peak_fringe = max(stats.peak_fringe, len(fringe))
     
+    return None, False
+
+def ida_star_search(*, start_state, heuristic, list_moves, apply_move,
+        search_limit=0, state_key=None):
+    """Perform an iterative deepening A* search through a state space.
+
+    Only the states along the current path are kept, so memory use grows with
+    the length of the path rather than the number of states searched. The
+    price is that states are searched again on each deepening pass.
+
+    Takes the same arguments as original_a_star_search, and returns the same
+    list of moves or 'None' if no path is found.
+
+    Optional keyword arugments:
+    search_limit -- If provided, search no more than this number of states
+        (over all passes) before returning None.
+    state_key -- Given a state return a hashable key identifying it. If
+        provided, paths that loop back to a state they already passed
+        through are not searched.
+    """
+
+    bound = heuristic(start_state)
+    if bound == 0:
+        return []
+
+    counter = 0
+    while True:
+        # Lowest cost estimate of the states cut off by this pass.
+        next_bound = None
+
+        path = []
+        states = [start_state]
+        pending = [iter(list_moves(start_state))]
+        keys = [state_key(start_state)] if state_key else []
+        # The same keys as a set, for quick loop checks on long paths.
+        key_set = set(keys)
+
+        while pending:
+            move = next(pending[-1], pending)
+            if move is pending:
+                # All moves from the deepest state have been tried.
+                pending.pop()
+                states.pop()
+                if keys:
+                    key_set.remove(keys.pop())
+                if path:
+                    path.pop()
+                continue
+
+            new_state = apply_move(states[-1], move)
+            if new_state is None:
+                continue
+            if state_key:
+                key = state_key(new_state)
+                if key in key_set:
+                    continue
+
+            heuristic_value = heuristic(new_state)
+            if heuristic_value == 0:
+                return path + [move]
+
+            cost = len(path) + 1 + heuristic_value
+            if cost > bound:
+                if next_bound is None or cost < next_bound:
+                    next_bound = cost
+                continue
+
+            counter = counter + 1
+            if search_limit > 0 and counter > search_limit:
+                return None
+
+            path.append(move)
+            states.append(new_state)
+            pending.append(iter(list_moves(new_state)))
+            if state_key:
+                keys.append(key)
+                key_set.add(key)
+
+        if next_bound is None:
+            return None
+        bound = next_bound
+
+class BoundedNode:
+    """A state held in the tree of a memory bounded search."""
+
+    __slots__ = ['state', 'parent', 'move', 'cost', 'ranking', 'children',
+            'forgotten', 'pruned']
+
+    def __init__(self, state, parent, move, cost, ranking):
+        self.state = state
+        self.parent = parent
+        self.move = move
+        self.cost = cost
+        self.ranking = ranking
+        # Number of children held in memory.
+        self.children = 0
+        # Lowest ranking of the children that were pruned.
+        self.forgotten = math.inf
+        self.pruned = False
+
+    def path(self):
+        moves = []
+        node = self
+        while node.parent:
+            moves.append(node.move)
+            node = node.parent
+        return moves[::-1]
+
+def sma_star_search(*, start_state, heuristic, list_moves, apply_move,
+        max_nodes, search_limit=0, state_key=None):
+    """Perform a simplified memory bounded A* (SMA*) search through a state
+    space.
+
+    Works like original_a_star_search, but holds no more than |max_nodes|
+    states in memory. When the search tree grows past that, the leaves with
+    the worst ranking are pruned and their parent remembers the best ranking
+    it lost. Once all of a state's children are pruned it is ranked by that
+    remembered value and searched again when it comes back to the front.
+
+    Returns the list of moves to the goal, or 'None' if no path was found.
+    Paths of |max_nodes| or more moves don't fit in memory and are never
+    found. When no path fits, the search can run for a very long time, so
+    it is best paired with a |search_limit|.
+
+    Required keyword arguments:
+    max_nodes -- The largest number of states to hold at once.
+
+    Optional keyword arugments:
+    search_limit -- If provided, search no more than this number of states
+        before returning None.
+    state_key -- Given a state return a hashable key identifying it. If
+        provided, paths that loop back to a state they already passed
+        through are not searched.
+    """
+
+    root = BoundedNode(start_state, None, None, 0, heuristic(start_state))
+    if root.ranking == 0:
+        return []
+
+    # Leaves waiting to be expanded: (ranking, -cost, counter, node). Deeper
+    # leaves win ties so the search commits to a path.
+    fringe = [(root.ranking, 0, 0, root)]
+    counter = 1
+    num_nodes = 1
+    expanded = 0
+
+    def forget(node):
+        """Drop a leaf from the tree, returning its parent if the parent is
+        now a leaf itself.
+        """
+        nonlocal num_nodes
+        node.pruned = True
+        num_nodes -= 1
+        parent = node.parent
+        parent.forgotten = min(parent.forgotten, node.ranking)
+        parent.children -= 1
+        if parent.children == 0:
+            parent.ranking = max(parent.ranking, parent.forgotten)
+            parent.forgotten = math.inf
+            return parent
+        return None
+
+    def prune():
+        """Forget the worst leaves until the tree fits in the budget."""
+        nonlocal counter
+        # Worst first: highest ranking, then shallowest.
+        leaves = [(-x[0], -x[1], x[2], x[3]) for x in fringe
+                if not x[3].pruned and not x[3].children]
+        heapq.heapify(leaves)
+        while num_nodes > max_nodes and leaves:
+            node = leaves[0][3]
+            if node is root:
+                break
+            heapq.heappop(leaves)
+            parent = forget(node)
+            if parent:
+                heapq.heappush(leaves,
+                        (-parent.ranking, parent.cost, counter, parent))
+                counter = counter + 1
+
+        fringe.clear()
+        for ranking, cost, count, node in leaves:
+            fringe.append((-ranking, -cost, count, node))
+        heapq.heapify(fringe)
+
+    while fringe:
+        node = heapq.heappop(fringe)[3]
+        if node.pruned or node.children:
+            continue
+        if node.ranking == math.inf:
+            return None
+
+        expanded = expanded + 1
+        if search_limit > 0 and expanded > search_limit:
+            return None
+
+        ancestors = set()
+        if state_key:
+            parent = node
+            while parent:
+                ancestors.add(state_key(parent.state))
+                parent = parent.parent
+
+        for move in list_moves(node.state):
+            new_state = apply_move(node.state, move)
+            if new_state is None:
+                continue
+            if state_key and state_key(new_state) in ancestors:
+                continue
+
+            heuristic_value = heuristic(new_state)
+            cost = node.cost + 1
+            child = BoundedNode(new_state, node, move, cost,
+                    max(node.ranking, cost + heuristic_value))
+            if heuristic_value == 0:
+                return child.path()
+            if cost >= max_nodes - 1:
+                # Any path through this state is too long to hold in memory.
+                continue
+
+            node.children += 1
+            num_nodes += 1
+            heapq.heappush(fringe, (child.ranking, -cost, counter, child))
+            counter = counter + 1
+
+        if not node.children:
+            # A dead end. Nothing below it is worth remembering.
+            node.ranking = math.inf
+            while node is not root:
+                node = forget(node)
+                if node is None:
+                    break
+                if node.ranking != math.inf:
+                    heapq.heappush(fringe, (node.ranking, -node.cost, counter, node))
+                    counter = counter + 1
+                    break
+            else:
+                return None
+
+        if num_nodes > max_nodes:
+            prune()
+
     return None
 
-def a_star_search(*, start_state, heuristic, list_adjacent):
+def a_star_search(*, start_state, heuristic, list_adjacent, frontier='heap',
+        stats=None):
     """Perform an A* search through a state space.
     
     Assumes that the cost of each state transition is one.
@@ -84,8 +552,36 @@ def a_star_search(*, start_state, heuristic, list_adjacent):
         to the goal state. Should return '0' if the state is in the goal state.
     list_adjacent -- Given a state return an iterable of states that can be
         reached from that state.
+
+    Optional keyword arugments:
+    frontier -- Which FRONTIERS queue to keep unexplored states in. 'heap'
+        (default) takes any priorities, 'bucket' needs integer heuristics.
+    stats -- A SearchStats to record the work done in. The time spent in
+        list_adjacent is counted as list_moves time.
+    """
+    return a_star_search_timed(start_state=start_state, heuristic=heuristic,
+            list_adjacent=list_adjacent, frontier=frontier, stats=stats)[0]
+
+def a_star_search_timed(*, start_state, heuristic, list_adjacent,
+        frontier='heap', stats=None, deadline=None, time_budget=None):
+    """As a_star_search, but stops when time runs out.
+
+    Always returns a tuple of (path, partial). When time runs out partial is
+    True, and path ends at the state with the lowest heuristic found so far.
+
+    Optional keyword arugments:
+    deadline -- A time.perf_counter() value to stop searching at.
+    time_budget -- A number of seconds to stop searching after.
     """
 
+    if stats is not None:
+        heuristic = stats.timed(heuristic, 'heuristic_seconds')
+        list_adjacent = stats.timed(list_adjacent, 'list_moves_seconds')
+
+    deadline = get_deadline(deadline, time_budget)
+    closest_value = None
+    closest_path = (start_state, False)
+
     def collapse_path(x):
         res = []
         while x:
@@ -94,22 +590,26 @@ def a_star_search(*, start_state, heuristic, list_adjacent):
         return res[::-1]
 
     explored = set([start_state])
-    fringe = PriorityQueue()
+    fringe = FRONTIERS[frontier]()
     # Fringe contents are a tuple with:
-    # (ranking, counter, cost, state)
-    counter = 0
-    fringe.put((0, counter, start_state, 0, (start_state, False)))
+    # (state, cost, path)
+    fringe.push(0, (start_state, 0, (start_state, False)))
 
+    while fringe:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return collapse_path(closest_path), True
 
-    while not fringe.empty():
-        node = fringe.get()
-        state = node[2]
-        cost = node[3]
-        path = node[4]
+        state, cost, path = fringe.pop()
+        if stats is not None:
+            stats.expanded += 1
 
         for new_state in list_adjacent(state):
-            counter = counter + 1
+            if stats is not None:
+                stats.generated += 1
+                stats.max_depth = max(stats.max_depth, cost + 1)
             if new_state in explored:
+                if stats is not None:
+                    stats.duplicates += 1
                 continue
             explored.add(new_state)
 
@@ -118,14 +618,24 @@ def a_star_search(*, start_state, heuristic, list_adjacent):
             new_path = (new_state, path)
 
             if heuristic_value == 0:
-                return collapse_path(new_path)
+                if stats is not None:
+                    stats.solution_depth = new_cost
+                return collapse_path(new_path), False
+            if deadline is not None and (closest_value is None
+                    or heuristic_value < closest_value):
+                closest_value = heuristic_value
+                closest_path = new_path
             
-            fringe.put((cost + heuristic_value, counter, new_state, new_cost, new_path))
+            fringe.push(cost + heuristic_value, (new_state, new_cost, new_path))
+
+        if stats is not None:
+            stats.peak_fringe = max(stats.peak_fringe, len(fringe))
     
-    return None
+    return None, False
 
 def explore_state_space(*, start_state, list_moves, apply_move, heuristic,
-        depth=3):
+        depth=3, undo_move=None, stats=None, executor=None, split_depth=1,
+        upper_bound=None, beam_width=0):
     """Perform a search through a state space, looking for a "best" path.
     
     Required keyword arguments:
@@ -138,30 +648,339 @@ def explore_state_space(*, start_state, list_moves, apply_move, heuristic,
 
     Optional keyword arugments:
     depth -- The depth at which to evaluate the heuristics.
+    undo_move -- If provided, apply_move is expected to modify the state in
+        place and undo_move(state) to revert the last applied move. It is
+        called once after every apply_move, whatever that returned. The whole
+        search then runs on the single start state without copying it.
+    stats -- A SearchStats to record the work done in. The callbacks are
+        only timed when this is given.
+    executor -- A concurrent.futures executor to search with. The tree is
+        split into one job per state |split_depth| moves from the start, and
+        the best leaves of the jobs are merged. The result is the same as
+        searching serially. Each job's state and the callbacks are pickled
+        when it is submitted, so they must be picklable (module level
+        functions or methods of picklable objects, not closures).
+    split_depth -- How many moves from the start to split the tree at.
+    upper_bound -- Given a state and the number of moves left before the
+        search depth, return a score that no leaf below the state can beat.
+        States whose bound is no better than the best score so far are not
+        searched further. The result is the same as without the bound.
+    beam_width -- If provided, search one layer at a time and only carry
+        the best |beam_width| states of each layer (by heuristic) on to the
+        next. Much faster at larger depths, but the best path can be missed.
+        Can't be combined with an executor.
+    """
+    return explore_state_space_timed(start_state=start_state,
+            list_moves=list_moves, apply_move=apply_move, heuristic=heuristic,
+            depth=depth, undo_move=undo_move, stats=stats, executor=executor,
+            split_depth=split_depth, upper_bound=upper_bound,
+            beam_width=beam_width)[0]
+
+def explore_state_space_timed(*, start_state, list_moves, apply_move,
+        heuristic, depth=3, undo_move=None, stats=None, executor=None,
+        split_depth=1, upper_bound=None, beam_width=0, deadline=None,
+        time_budget=None):
+    """As explore_state_space, but stops when time runs out.
+
+    Always returns a tuple of (path, partial). When time runs out partial is
+    True, and path is the best of the paths scored so far.
+
+    Optional keyword arugments:
+    deadline -- A time.perf_counter() value to stop searching at.
+    time_budget -- A number of seconds to stop searching after.
+    """
+
+    deadline = get_deadline(deadline, time_budget)
+
+    if beam_width > 0:
+        if executor is not None:
+            raise ValueError('Beam search can not be run on an executor')
+        _, best_path, partial = explore_beam(start_state, list_moves,
+                apply_move, undo_move, heuristic, depth, deadline, stats,
+                beam_width)
+    elif executor is not None and depth > split_depth:
+        best_path, partial = explore_parallel(start_state, list_moves,
+                apply_move, undo_move, heuristic, depth, deadline, stats,
+                upper_bound, executor, split_depth)
+    else:
+        _, best_path, partial = explore_serial(start_state, list_moves,
+                apply_move, undo_move, heuristic, depth, deadline, stats,
+                upper_bound)
+
+    return best_path, partial
+
+def explore_serial(state, list_moves, apply_move, undo_move, heuristic, depth,
+        deadline, stats, upper_bound):
+    """Run explore_state_space on one core. Returns (best score, best path,
+    whether the deadline cut the search short).
     """
+    if stats is not None:
+        heuristic = stats.timed(heuristic, 'heuristic_seconds')
+        list_moves = stats.timed(list_moves, 'list_moves_seconds')
+        apply_move = stats.timed(apply_move, 'apply_move_seconds')
 
+    if undo_move is not None:
+        return explore_in_place(state, list_moves, apply_move, undo_move,
+                heuristic, depth, deadline, stats, upper_bound)
+    return explore_copying(state, list_moves, apply_move, heuristic, depth,
+            deadline, stats, upper_bound)
+
+def explore_copying(start_state, list_moves, apply_move, heuristic, depth,
+        deadline=None, stats=None, upper_bound=None):
+    """Version of explore_state_space for apply_move functions that create
+    new states. Returns (best score, best path, whether the deadline cut the
+    search short).
+    """
     fringe = [(start_state, [])]
-    to_check = []
+    best_score = 0
+    best_path = None
+    partial = False
 
     while fringe:
+        if deadline is not None and time.perf_counter() >= deadline:
+            partial = True
+            break
+
         state, path = fringe.pop()
+        # Leaves have to beat the best score (starting at 0) to count.
+        if upper_bound and \
+                upper_bound(state, depth - len(path)) <= best_score:
+            if stats is not None:
+                stats.pruned += 1
+            continue
+
         moves = list_moves(state)
+        if stats is not None:
+            stats.expanded += 1
         for move in moves:
             new_state = apply_move(state, move)
             new_path = path + [move]
             if new_state is None:
                 continue
+            if stats is not None:
+                stats.generated += 1
+                stats.max_depth = max(stats.max_depth, len(new_path))
             if len(new_path) >= depth:
-                to_check.append((new_state, new_path))
+                score = heuristic(new_state)
+                if best_score < score:
+                    best_score = score
+                    best_path = new_path
             else:
                 fringe.append((new_state, new_path))
+
+        if stats is not None:
+            stats.peak_fringe = max(stats.peak_fringe, len(fringe))
     
+    return best_score, best_path, partial
+
+def explore_in_place(state, list_moves, apply_move, undo_move, heuristic,
+        depth, deadline=None, stats=None, upper_bound=None):
+    """Depth first version of explore_state_space for states that are
+    modified in place. Leaves are scored in the same order as the copying
+    search so ties resolve the same way.
+
+    Returns (best score, best path, whether the deadline cut the search
+    short).
+    """
     best_score = 0
     best_path = None
-    for state, path in to_check:
-        score = heuristic(state)
-        if best_score < score:
+    path = []
+
+    def visit():
+        """Search below the current state. Returns False if time ran out."""
+        nonlocal best_score, best_path
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        # Leaves have to beat the best score (starting at 0) to count.
+        if upper_bound and \
+                upper_bound(state, depth - len(path)) <= best_score:
+            if stats is not None:
+                stats.pruned += 1
+            return True
+        moves = list_moves(state)
+        if stats is not None:
+            stats.expanded += 1
+        at_leaves = len(path) + 1 >= depth
+        finished = True
+        # The copying search expands the last child first.
+        for move in (moves if at_leaves else moves[::-1]):
+            path.append(move)
+            if apply_move(state, move) is not None:
+                if stats is not None:
+                    stats.generated += 1
+                    stats.max_depth = max(stats.max_depth, len(path))
+                    # Only the current path is held.
+                    stats.peak_fringe = max(stats.peak_fringe, len(path))
+                if not at_leaves:
+                    finished = visit()
+                else:
+                    score = heuristic(state)
+                    if best_score < score:
+                        best_score = score
+                        best_path = list(path)
+            undo_move(state)
+            path.pop()
+            if not finished:
+                break
+        return finished
+
+    finished = visit()
+    return best_score, best_path, not finished
+
+def explore_beam(start_state, list_moves, apply_move, undo_move, heuristic,
+        depth, deadline, stats, beam_width):
+    """Beam search version of explore_state_space. Returns (best score, best
+    path, whether the deadline cut the search short).
+
+    With undo_move, the states of a layer are kept as paths and rebuilt from
+    the start state when they are expanded.
+    """
+    if stats is not None:
+        heuristic = stats.timed(heuristic, 'heuristic_seconds')
+        list_moves = stats.timed(list_moves, 'list_moves_seconds')
+        apply_move = stats.timed(apply_move, 'apply_move_seconds')
+
+    best_score = 0
+    best_path = None
+    layer = [(start_state, [])]
+
+    for level in range(1, depth + 1):
+        # (score, path, state) for the states of the next layer.
+        scored = []
+        for state, path in layer:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return best_score, best_path, True
+
+            if undo_move is not None:
+                state = start_state
+                for move in path:
+                    apply_move(state, move)
+
+            moves = list_moves(state)
+            if stats is not None:
+                stats.expanded += 1
+            for move in moves:
+                new_state = apply_move(state, move)
+                if new_state is not None:
+                    if stats is not None:
+                        stats.generated += 1
+                        stats.max_depth = max(stats.max_depth, level)
+                    score = heuristic(new_state)
+                    if level == depth:
+                        if best_score < score:
+                            best_score = score
+                            best_path = path + [move]
+                    else:
+                        scored.append((score, path + [move],
+                                new_state if undo_move is None else None))
+                if undo_move is not None:
+                    undo_move(state)
+
+            if undo_move is not None:
+                for move in path:
+                    undo_move(state)
+
+        # Stable, so the first found of equally scored states are kept.
+        scored.sort(key=lambda x: -x[0])
+        layer = [(state, path) for _, path, state in scored[:beam_width]]
+        if stats is not None:
+            stats.peak_fringe = max(stats.peak_fringe, len(scored))
+
+    return best_score, best_path, False
+
+###############################################################################
+
+def split_states(start_state, list_moves, apply_move, undo_move, split_depth,
+        stats=None):
+    """Yield (state, path) for each state |split_depth| moves from the start,
+    in the order a serial explore_state_space would search below them.
+
+    With undo_move, the state is the start state with the path applied, and
+    is only valid until the next state is asked for.
+    """
+    if undo_move is None:
+        fringe = [(start_state, [])]
+        while fringe:
+            state, path = fringe.pop()
+            if len(path) == split_depth:
+                yield state, path
+                continue
+            if stats is not None:
+                stats.expanded += 1
+            for move in list_moves(state):
+                new_state = apply_move(state, move)
+                if new_state is not None:
+                    if stats is not None:
+                        stats.generated += 1
+                    fringe.append((new_state, path + [move]))
+        return
+
+    path = []
+
+    def visit():
+        if len(path) == split_depth:
+            yield start_state, list(path)
+            return
+        if stats is not None:
+            stats.expanded += 1
+        for move in list_moves(start_state)[::-1]:
+            path.append(move)
+            if apply_move(start_state, move) is not None:
+                if stats is not None:
+                    stats.generated += 1
+                yield from visit()
+            undo_move(start_state)
+            path.pop()
+
+    yield from visit()
+
+def explore_subtree(job):
+    """Run a pickled explore_state_space job in a worker process. Returns
+    (best score, best path, partial, SearchStats or None).
+    """
+    state, list_moves, apply_move, undo_move, heuristic, upper_bound, depth, \
+        remaining, submitted, want_stats = pickle.loads(job)
+    # perf_counter values can't be compared between processes, so the
+    # deadline comes over as the seconds left when the job was submitted.
+    # Time spent waiting in the executor's queue is taken off using the
+    # wall clock, which processes do share.
+    deadline = None
+    if remaining is not None:
+        queued = max(0.0, time.time() - submitted)
+        deadline = time.perf_counter() + remaining - queued
+    stats = SearchStats() if want_stats else None
+    return explore_serial(state, list_moves, apply_move, undo_move,
+            heuristic, depth, deadline, stats, upper_bound) + (stats,)
+
+def explore_parallel(start_state, list_moves, apply_move, undo_move,
+        heuristic, depth, deadline, stats, upper_bound, executor,
+        split_depth):
+    """Run explore_state_space with one executor job per state at the split
+    depth. Returns (best path, partial).
+    """
+    jobs = []
+    for state, path in split_states(start_state, list_moves, apply_move,
+            undo_move, split_depth, stats):
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.perf_counter()
+        # Pickle now, while an in-place state still holds this path.
+        job = pickle.dumps((state, list_moves, apply_move, undo_move,
+                heuristic, upper_bound, depth - split_depth, remaining,
+                time.time(), stats is not None))
+        jobs.append((path, executor.submit(explore_subtree, job)))
+
+    # Merge in serial search order so that ties resolve the same way.
+    best_score = 0
+    best_path = None
+    partial = False
+    for path, future in jobs:
+        score, subpath, subpartial, substats = future.result()
+        partial = partial or subpartial
+        if stats is not None:
+            stats.add(substats, split_depth)
+        if subpath is not None and best_score < score:
             best_score = score
-            best_path = path
-    
-    return best_path
+            best_path = path + subpath
+
+    return best_path, partial
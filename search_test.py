@@ -1,3 +1,7 @@
+import concurrent.futures
+import pytest
+
+import search
 from search import *
 
 def test_a_star_search():
@@ -10,4 +14,422 @@ def test_a_star_search():
                 list_adjacent=lambda x: [x + 1, x - 1]
             ) == [1,2,3,4,5,6,7]
 
-    
\ No newline at end of file
+def test_a_star_search_frontiers():
+    start = 1
+    goal = 7
+
+    for frontier in FRONTIERS:
+        assert a_star_search(
+                    start_state=start,
+                    heuristic=lambda x: abs(goal - x),
+                    list_adjacent=lambda x: [x + 1, x - 1],
+                    frontier=frontier
+                ) == [1,2,3,4,5,6,7]
+
+        assert original_a_star_search(
+                    start_state=start,
+                    heuristic=lambda x: abs(goal - x),
+                    list_moves=lambda x: [1, -1],
+                    apply_move=lambda x, move: x + move,
+                    frontier=frontier
+                ) == [1,1,1,1,1,1]
+
+def test_frontiers_pop_in_priority_order():
+    for frontier in FRONTIERS.values():
+        fringe = frontier()
+        for priority, item in [(3, 'a'), (1, 'b'), (3, 'c'), (0, 'd'), (1, 'e')]:
+            fringe.push(priority, item)
+        assert len(fringe) == 5
+        # Ties come out first in, first out.
+        assert [fringe.pop() for _ in range(3)] == ['d', 'b', 'e']
+        fringe.push(2, 'f')
+        assert [fringe.pop() for _ in range(3)] == ['f', 'a', 'c']
+        assert not fringe
+
+def test_bucket_frontier_needs_integers():
+    fringe = BucketFrontier()
+    for priority in [-1, 1.5]:
+        with pytest.raises(ValueError):
+            fringe.push(priority, 'x')
+    fringe.push(2.0, 'x')
+    assert fringe.pop() == 'x'
+
+def test_explore_state_space_in_place():
+    moves = [-1, 1, 2]
+
+    def apply_move(state, move):
+        state.append(state[-1] + move)
+        return state if state[-1] < 6 else None
+
+    expected = explore_state_space(
+                start_state=[0],
+                list_moves=lambda x: moves,
+                apply_move=lambda x, move: [x[0] + move] if x[0] + move < 6 else None,
+                heuristic=lambda x: 10 - abs(x[0] - 4),
+                depth=3)
+    assert expected == [2, 1, 1]
+
+    assert explore_state_space(
+                start_state=[0],
+                list_moves=lambda x: moves,
+                apply_move=apply_move,
+                undo_move=lambda x: x.pop(),
+                heuristic=lambda x: 10 - abs(x[-1] - 4),
+                depth=3) == expected
+
+def test_original_a_star_search_state_key():
+    expanded = []
+
+    def list_moves(x):
+        expanded.append(x)
+        return [(1, 0), (0, 1)]
+
+    def apply_move(x, move):
+        return (x[0] + move[0], x[1] + move[1])
+
+    def search(**kwargs):
+        expanded.clear()
+        return original_a_star_search(
+                start_state=(0, 0),
+                heuristic=lambda x: 8 - x[0] - x[1],
+                list_moves=list_moves,
+                apply_move=apply_move,
+                **kwargs)
+
+    # Every cell of the grid can be reached along many paths.
+    path = search()
+    assert len(path) == 8
+    assert len(expanded) > len(set(expanded))
+
+    assert len(search(state_key=lambda x: x)) == 8
+    assert len(expanded) == len(set(expanded))
+
+def test_original_a_star_search_reopens_cheaper_states():
+    # 'b' is first reached the long way round, through 'x' and 'y', and has
+    # to be queued again when the direct route through 'd' is found.
+    edges = {
+        'a': ['x', 'd'],
+        'x': ['y'],
+        'y': ['b'],
+        'd': ['b'],
+        'b': ['c'],
+        'c': ['goal'],
+    }
+    guesses = {'a': 3, 'x': 1, 'y': 1, 'd': 3, 'b': 2, 'c': 1, 'goal': 0}
+    expanded = []
+
+    def list_moves(x):
+        expanded.append(x)
+        return edges[x]
+
+    assert original_a_star_search(
+                start_state='a',
+                heuristic=lambda x: guesses[x],
+                list_moves=list_moves,
+                apply_move=lambda x, move: move,
+                state_key=lambda x: x) == ['d', 'b', 'c', 'goal']
+    assert expanded == ['a', 'x', 'y', 'd', 'b', 'c']
+
+def grid_search_arguments(width, height, walls, goal):
+    """Callbacks for searching a grid with walls from (0, 0) to a goal."""
+    def list_moves(x):
+        return [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+    def apply_move(x, move):
+        new = (x[0] + move[0], x[1] + move[1])
+        if new in walls or not (0 <= new[0] < width and 0 <= new[1] < height):
+            return None
+        return new
+
+    return dict(
+        start_state=(0, 0),
+        heuristic=lambda x: abs(goal[0] - x[0]) + abs(goal[1] - x[1]),
+        list_moves=list_moves,
+        apply_move=apply_move)
+
+def follow(start, path):
+    for move in path:
+        start = (start[0] + move[0], start[1] + move[1])
+    return start
+
+# A wall down the middle of a 7x7 grid with a gap at the bottom.
+WALLS = {(3, y) for y in range(6)}
+
+def test_ida_star_search():
+    arguments = grid_search_arguments(7, 7, WALLS, (6, 0))
+    path = ida_star_search(**arguments, state_key=lambda x: x)
+    assert follow((0, 0), path) == (6, 0)
+    assert len(path) == len(original_a_star_search(**arguments,
+            state_key=lambda x: x)) == 18
+
+    assert ida_star_search(**arguments, search_limit=10) is None
+
+    walled_in = grid_search_arguments(7, 7, WALLS | {(3, 6)}, (6, 0))
+    assert ida_star_search(**walled_in, search_limit=1000,
+            state_key=lambda x: x) is None
+
+    # Running out of paths without a limit.
+    boxed_in = grid_search_arguments(2, 2, {(1, 0)}, (1, 0))
+    assert ida_star_search(**boxed_in, state_key=lambda x: x) is None
+
+def test_sma_star_search():
+    arguments = grid_search_arguments(7, 7, WALLS, (6, 0))
+    for max_nodes in [1000, 30, 20]:
+        path = sma_star_search(**arguments, max_nodes=max_nodes,
+                state_key=lambda x: x)
+        assert follow((0, 0), path) == (6, 0)
+        assert len(path) == 18
+
+    assert sma_star_search(**arguments, max_nodes=30, search_limit=10) is None
+
+    walled_in = grid_search_arguments(7, 7, WALLS | {(3, 6)}, (6, 0))
+    assert sma_star_search(**walled_in, max_nodes=30, search_limit=10000,
+            state_key=lambda x: x) is None
+
+class TickingClock:
+    """Stands in for the time module, moving on a second every time it is
+    read.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter(self):
+        self.now += 1
+        return self.now
+
+def test_searches_stop_at_deadline(monkeypatch):
+    arguments = grid_search_arguments(7, 7, WALLS, (6, 0))
+
+    path, partial = original_a_star_search_timed(**arguments,
+            state_key=lambda x: x, time_budget=10)
+    assert not partial and len(path) == 18
+
+    # Out of time before anything is searched.
+    assert original_a_star_search_timed(**arguments, time_budget=0) \
+            == (None, True)
+
+    # The plain searches take no deadline, so always return just a path.
+    with pytest.raises(TypeError):
+        original_a_star_search(**arguments, time_budget=0)
+
+    # After a few states, return the path to the closest one found.
+    monkeypatch.setattr('search.time', TickingClock())
+    path, partial = original_a_star_search_timed(**arguments,
+            state_key=lambda x: x, deadline=4)
+    assert partial
+    assert path == [(1, 0), (1, 0)]
+
+    start = 1
+    goal = 7
+    arguments = dict(
+        start_state=start,
+        heuristic=lambda x: abs(goal - x),
+        list_adjacent=lambda x: [x + 1, x - 1])
+    assert a_star_search_timed(**arguments, time_budget=100) \
+            == ([1,2,3,4,5,6,7], False)
+    assert a_star_search_timed(**arguments, time_budget=0) == ([1], True)
+    assert a_star_search_timed(**arguments, time_budget=3) \
+            == ([1, 2, 3], True)
+
+def test_explore_state_space_stops_at_deadline(monkeypatch):
+    moves = [-1, 1, 2]
+
+    def apply_move(state, move):
+        state.append(state[-1] + move)
+        return state if state[-1] < 6 else None
+
+    copying = dict(
+        start_state=[0],
+        list_moves=lambda x: moves,
+        apply_move=lambda x, move: [x[0] + move] if x[0] + move < 6 else None,
+        heuristic=lambda x: 10 - abs(x[0] - 4),
+        depth=3)
+    in_place = dict(copying,
+        apply_move=apply_move,
+        undo_move=lambda x: x.pop(),
+        heuristic=lambda x: 10 - abs(x[-1] - 4))
+
+    for arguments in [copying, in_place]:
+        assert explore_state_space_timed(**arguments, time_budget=100) \
+                == ([2, 1, 1], False)
+        assert explore_state_space_timed(**arguments, time_budget=0) \
+                == (None, True)
+
+    monkeypatch.setattr('search.time', TickingClock())
+    for arguments in [copying, in_place]:
+        start = arguments['start_state']
+        path, partial = explore_state_space_timed(**arguments,
+                deadline=search.time.now + 4)
+        assert partial and path is not None
+        assert start == [0]
+
+def test_search_stats():
+    stats = SearchStats()
+    start = 1
+    goal = 7
+    assert a_star_search(
+                start_state=start,
+                heuristic=lambda x: abs(goal - x),
+                list_adjacent=lambda x: [x + 1, x - 1],
+                stats=stats
+            ) == [1,2,3,4,5,6,7]
+    assert stats.expanded == 6
+    assert stats.generated == 11
+    # Stepping back onto the previous number.
+    assert stats.duplicates == 4
+    assert stats.solution_depth == stats.max_depth == 6
+    assert stats.heuristic_seconds > 0
+    assert stats.list_moves_seconds > 0
+    assert stats.apply_move_seconds == 0
+
+    stats = SearchStats()
+    arguments = grid_search_arguments(7, 7, WALLS, (6, 0))
+    path = original_a_star_search(**arguments, state_key=lambda x: x,
+            stats=stats)
+    assert stats.solution_depth == len(path) == 18
+    assert stats.expanded <= 7 * 7 - len(WALLS)
+    assert stats.duplicates > 0
+    assert stats.peak_fringe > 0
+    assert stats.apply_move_seconds > 0
+
+    for undo_move in [None, lambda x: x.pop()]:
+        stats = SearchStats()
+        explore_state_space(
+                start_state=[0],
+                list_moves=lambda x: [-1, 1],
+                apply_move=lambda x, move: x + [move] if undo_move is None
+                    else x.append(move) or x,
+                undo_move=undo_move,
+                heuristic=lambda x: 1,
+                depth=3,
+                stats=stats)
+        assert stats.generated == 2 + 4 + 8
+        assert stats.expanded == 1 + 2 + 4
+        assert stats.max_depth == 3
+
+def test_search_stats_branching_factor():
+    stats = SearchStats()
+    assert stats.branching_factor() == 0
+    # 2 + 4 + 8 states in a tree three deep.
+    stats.generated = 14
+    stats.max_depth = 3
+    assert abs(stats.branching_factor() - 2) < 1e-6
+    stats.solution_depth = 1
+    assert abs(stats.branching_factor() - 14) < 1e-6
+
+    # Deep searches, such as crossing a 100x100 board, mustn't overflow.
+    stats = SearchStats()
+    stats.generated = 5000
+    stats.max_depth = 300
+    b = stats.branching_factor()
+    assert 1 < b < 1.02
+    assert abs(sum(b ** x for x in range(1, 301)) - 5000) < 1e-3
+    assert 'branching 1.01' in str(stats)
+
+# Callbacks for exploring sums of moves. They are module level so that they
+# can be pickled for a process pool.
+
+def sum_moves(state):
+    return [-1, 1, 2, 3]
+
+def sum_apply(state, move):
+    total = state[-1] + move
+    return [total] if total < 9 else None
+
+def sum_apply_in_place(state, move):
+    state.append(state[-1] + move)
+    return state if state[-1] < 9 else None
+
+def sum_undo(state):
+    state.pop()
+
+def sum_score(state):
+    # Plenty of ties, so the merge order matters.
+    return 10 - abs(state[-1] - 5) // 2
+
+def test_explore_state_space_parallel():
+    copying = dict(
+        start_state=[0],
+        list_moves=sum_moves,
+        apply_move=sum_apply,
+        heuristic=sum_score,
+        depth=4)
+    in_place = dict(copying,
+        apply_move=sum_apply_in_place,
+        undo_move=sum_undo)
+    expected = explore_state_space(**copying)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+        for arguments in [copying, in_place]:
+            assert explore_state_space(**arguments) == expected
+            for split_depth in [1, 2, 3, 4]:
+                stats = SearchStats()
+                assert explore_state_space(**arguments, executor=pool,
+                        split_depth=split_depth, stats=stats) == expected
+                serial = SearchStats()
+                explore_state_space(**arguments, stats=serial)
+                assert stats.generated == serial.generated
+                assert stats.expanded == serial.expanded
+                assert stats.max_depth == serial.max_depth == 4
+            assert arguments['start_state'] == [0]
+
+        assert explore_state_space_timed(**copying, executor=pool,
+                time_budget=100) == (expected, False)
+        # Jobs get the time that was left when they were submitted.
+        assert explore_state_space_timed(**in_place, executor=pool,
+                split_depth=1, time_budget=0) == (None, True)
+
+def sum_upper_bound(state, remaining):
+    # Moves change the total by at most 3.
+    return 10 - max(0, abs(state[-1] - 5) - 3 * remaining) // 2
+
+def test_explore_state_space_upper_bound():
+    copying = dict(
+        start_state=[0],
+        list_moves=sum_moves,
+        apply_move=sum_apply,
+        heuristic=sum_score,
+        depth=4)
+    in_place = dict(copying,
+        apply_move=sum_apply_in_place,
+        undo_move=sum_undo)
+    expected = explore_state_space(**copying)
+
+    for arguments in [copying, in_place]:
+        stats = SearchStats()
+        assert explore_state_space(**arguments, upper_bound=sum_upper_bound,
+                stats=stats) == expected
+        assert stats.pruned > 0
+        assert arguments['start_state'] == [0]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+        assert explore_state_space(**in_place, upper_bound=sum_upper_bound,
+                executor=pool, split_depth=2) == expected
+
+def test_explore_state_space_beam():
+    copying = dict(
+        start_state=[0],
+        list_moves=sum_moves,
+        apply_move=sum_apply,
+        heuristic=lambda x: x[-1],
+        depth=4)
+    in_place = dict(copying,
+        apply_move=sum_apply_in_place,
+        undo_move=sum_undo)
+
+    for arguments in [copying, in_place]:
+        # Greedily heading to 8 leaves no move but back down.
+        assert explore_state_space(**arguments, beam_width=1) == [3, 3, 2, -1]
+        # A wide enough beam finds the way to 8.
+        assert explore_state_space(**arguments, beam_width=64) \
+                == explore_state_space(**arguments) == [3, 3, 1, 1]
+        stats = SearchStats()
+        explore_state_space(**arguments, beam_width=2, stats=stats)
+        # Two states are expanded on each layer below the first.
+        assert stats.expanded == 1 + 2 + 2 + 2
+        assert arguments['start_state'] == [0]
+
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        with pytest.raises(ValueError):
+            explore_state_space(**copying, beam_width=2, executor=pool)
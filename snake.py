@@ -1,12 +1,19 @@
 import collections
-import itertools
-import pygame
 import random
 
-import common
+import grid
+import supergrid
 
 class Snake:
 
+    __slots__ = [
+        'width', 'height', 'board', 'seed', 'rng', 'state', 'snake_position',
+        'occupancy', 'laid_at', 'free_cells', 'free_slots', 'cell_keys',
+        'head_keys',
+        'occupied_hash', 'goal', 'moves', 'points',
+        'moves_since_point', 'history', 'recorder', 'supergrid', 'ai_data',
+    ]
+
     PLAYING = 1
     WON = 2
     DIED = 3
@@ -17,35 +24,75 @@ class Snake:
     EAST = (1, 0)
     VALID_DIRECTIONS = [NORTH, SOUTH, WEST, EAST]
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, seed=None):
+        """Create a new game. Goals are placed from |seed| (a non-negative
+        integer), so two games with the same seed and moves play out the same
+        way. A random seed is picked if none is given.
+        """
         self.width = width
         self.height = height
+        # Shared neighbor and position tables for this board size.
+        self.board = grid.board(width, height)
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random()
         self.state = Snake.PLAYING
-        self.snake_position = collections.deque([
+        self.moves = 0
+        self.points = 0
+        self.moves_since_point = 0
+        # Optional supergrid.Supergrid kept up to date with the occupied
+        # cells (see track_supergrid).
+        self.supergrid = None
+        self.set_snake_position([
             (width // 2, height // 2),
             (width // 2, height // 2),
             (width // 2, height // 2)])
         self.goal = self.generate_goal()
-        self.moves = 0
-        self.points = 0
-        self.moves_since_point = 0
-
-        # Rendering variables
-        self.font = None
-        self.win_text = None
-        self.lose_text = None
+        # Undo records for moves applied with push_move.
+        self.history = []
+        # Optional gametrace.TraceWriter told about every advance.
+        self.recorder = None
         self.ai_data = None
 
     def copy(self):
-        other = Snake(self.width, self.height)
+        """Copy the game state for use in a search.
+
+        Skips the constructor so no throwaway body is built and no goal is
+        rolled. The copy shares the seed and random generator, so it places
+        the same goals the original would after the same moves. AI data is
+        not carried over.
+        """
+        other = Snake.__new__(Snake)
+        other.width = self.width
+        other.height = self.height
+        other.board = self.board
+        other.seed = self.seed
+        other.rng = self.rng
         other.state = Snake.PLAYING
         other.snake_position = self.snake_position.copy()
+        other.occupancy = self.occupancy[:]
+        other.laid_at = self.laid_at[:]
+        other.free_cells = self.free_cells[:]
+        other.free_slots = self.free_slots[:]
+        other.cell_keys = self.cell_keys
+        other.head_keys = self.head_keys
+        other.occupied_hash = self.occupied_hash
         other.goal = self.goal
         other.moves = self.moves
         other.points = self.points
         other.moves_since_point = self.moves_since_point
+        other.history = []
+        other.recorder = None
+        other.supergrid = None
+        if self.supergrid is not None:
+            other.supergrid = self.supergrid.copy()
+        other.ai_data = None
         return other
 
+    def get_seed(self):
+        return self.seed
+
     def get_width(self):
         return self.width
     
@@ -61,6 +108,132 @@ class Snake:
     def get_snake_position(self):
         return self.snake_position
 
+    def set_snake_position(self, positions):
+        """Replace the snake's body, rebuilding the occupancy grid and free
+        cell list to match.
+        """
+        self.snake_position = collections.deque(positions)
+        cells = self.width * self.height
+        # Number of snake segments on each cell, indexed by x + y * width.
+        self.occupancy = bytearray(cells)
+        # The move at which the newest segment on each cell was laid, so the
+        # segment is |moves - laid_at| back from the head. Cells the snake
+        # has never covered start far enough back to count as long free.
+        self.laid_at = [-cells - len(self.snake_position)] * cells
+        for index in range(len(self.snake_position) - 1, -1, -1):
+            x, y = self.snake_position[index]
+            self.laid_at[x + y * self.width] = self.moves - index
+        # Unoccupied cells in no particular order, plus the slot each cell
+        # holds in that list (-1 when occupied) for O(1) insert and removal.
+        self.free_cells = list(range(self.width * self.height))
+        self.free_slots = list(range(self.width * self.height))
+        # Zobrist hash of the set of occupied cells.
+        self.cell_keys = self.board.cell_keys
+        self.head_keys = self.board.head_keys
+        self.occupied_hash = 0
+        tracking = self.supergrid is not None
+        self.supergrid = None
+        for pos in self.snake_position:
+            self.occupy_cell(self.cell_index(pos))
+        if tracking:
+            self.track_supergrid()
+
+    def track_supergrid(self):
+        """Keep a supergrid.Supergrid of the free 2x2 areas up to date as
+        the snake moves, from now on. Copies carry it with them.
+        """
+        self.supergrid = supergrid.Supergrid(self.width, self.height,
+                self.occupancy)
+
+    def get_supergrid(self):
+        return self.supergrid
+
+    def occupy_cell(self, index):
+        """Add a segment to a cell, taking it off the free list if needed.
+
+        Returns the slot the cell held in the free list, or -1 if it was
+        already occupied.
+        """
+        slot = -1
+        if not self.occupancy[index]:
+            slot = self.free_slots[index]
+            last = self.free_cells.pop()
+            if last != index:
+                self.free_cells[slot] = last
+                self.free_slots[last] = slot
+            self.free_slots[index] = -1
+            self.occupied_hash ^= self.cell_keys[index]
+            if self.supergrid is not None:
+                self.supergrid.cover_cell(index)
+        self.occupancy[index] += 1
+        return slot
+
+    def unoccupy_cell(self, index, slot):
+        """Exactly revert occupy_cell, given the slot it returned."""
+        self.occupancy[index] -= 1
+        if slot < 0:
+            return
+        self.occupied_hash ^= self.cell_keys[index]
+        if self.supergrid is not None:
+            self.supergrid.free_cell(index)
+        if slot < len(self.free_cells):
+            moved = self.free_cells[slot]
+            self.free_slots[moved] = len(self.free_cells)
+            self.free_cells.append(moved)
+            self.free_cells[slot] = index
+        else:
+            self.free_cells.append(index)
+        self.free_slots[index] = slot
+
+    def vacate_cell(self, index):
+        """Remove a segment from a cell, freeing it if it is now empty."""
+        self.occupancy[index] -= 1
+        if not self.occupancy[index]:
+            self.free_slots[index] = len(self.free_cells)
+            self.free_cells.append(index)
+            self.occupied_hash ^= self.cell_keys[index]
+            if self.supergrid is not None:
+                self.supergrid.free_cell(index)
+
+    def unvacate_cell(self, index):
+        """Exactly revert vacate_cell."""
+        if not self.occupancy[index]:
+            self.free_cells.pop()
+            self.free_slots[index] = -1
+            self.occupied_hash ^= self.cell_keys[index]
+            if self.supergrid is not None:
+                self.supergrid.cover_cell(index)
+        self.occupancy[index] += 1
+
+    def get_occupancy(self):
+        return self.occupancy
+
+    def get_laid_at(self):
+        """Return the move at which the newest segment on each cell (indexed
+        as in get_occupancy) was laid. A cell is under the snake for
+        len(snake) - 1 - (moves - laid_at) more turns; zero or less means it
+        is free.
+        """
+        return self.laid_at
+
+    def get_occupancy_key(self):
+        """Return a 64 bit Zobrist hash of which cells are occupied."""
+        return self.occupied_hash
+
+    def get_state_key(self):
+        """Return a 64 bit Zobrist hash of the occupied cells and the head
+        position, for use as a transposition table key. Distinct states may
+        collide, but only with negligible probability.
+        """
+        head = self.snake_position[0]
+        return self.occupied_hash ^ self.head_keys[head[0] + head[1] * self.width]
+
+    def cell_index(self, pos):
+        return pos[0] + pos[1] * self.width
+
+    def is_occupied(self, pos):
+        return self.occupancy[pos[0] + pos[1] * self.width] > 0
+
     def get_snake_head(self):
         return self.snake_position[0]
 
@@ -83,34 +256,86 @@ class Snake:
         self.ai_data = value
 
     def generate_goal(self):
-        possibilities = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if (x,y) not in self.snake_position:
-                    possibilities.append((x,y))
-        if possibilities:
-            return random.choice(possibilities)
+        # Each goal comes from a stream keyed on the seed and the points
+        # scored so far. Copies and pushed moves can then share the generator
+        # without changing the goals of the game they came from.
+        self.rng.seed((self.seed << 32) | self.points)
+        if self.free_cells:
+            return self.board.positions[self.rng.choice(self.free_cells)]
         else:
             return None
 
+    def set_recorder(self, recorder):
+        self.recorder = recorder
+
     def advance(self, direction):
-        if self.state != Snake.PLAYING:
+        playing = self.state == Snake.PLAYING
+        self.make_move(direction)
+        if self.recorder is not None and playing:
+            self.recorder.record_move(self, direction)
+
+    def push_move(self, direction):
+        """Advance the game in a way that can be reverted with pop_move.
+
+        Lets tree searches walk a single board instead of copying it for
+        every child.
+        """
+        self.history.append(self.make_move(direction))
+
+    def pop_move(self):
+        """Revert the most recent move applied with push_move."""
+        undo = self.history.pop()
+        if undo is None:
             return
+        state, moves_since_point, points, goal, head_slot, head_laid_at, \
+                tail = undo
+
+        if tail is not None:
+            self.snake_position.append(tail)
+            self.unvacate_cell(tail[0] + tail[1] * self.width)
+        if head_slot is not None:
+            head = self.snake_position.popleft()
+            index = head[0] + head[1] * self.width
+            self.unoccupy_cell(index, head_slot)
+            self.laid_at[index] = head_laid_at
+
+        self.state = state
+        self.moves -= 1
+        self.moves_since_point = moves_since_point
+        self.points = points
+        self.goal = goal
+
+    def make_move(self, direction):
+        """Advance the game, returning a record that pop_move can use to
+        revert it (None if nothing changed).
+        """
+        if self.state != Snake.PLAYING:
+            return None
+
+        # Undo record: (state, moves_since_point, points, goal, head_slot,
+        # head_laid_at, tail). head_slot and head_laid_at are None if the
+        # body didn't move and tail is None if no tail segment was removed.
+        undo = (self.state, self.moves_since_point, self.points, self.goal)
 
         self.moves += 1
         self.moves_since_point += 1
 
         if direction not in self.VALID_DIRECTIONS:
             self.state = Snake.DIED
-            return
+            return undo + (None, None, None)
 
         if not self.is_direction_safe(direction):
             self.state = Snake.DIED
-            return
+            return undo + (None, None, None)
+
+        head = self.snake_position[0]
+        index = self.board.steps[direction][head[0] + head[1] * self.width]
+        next = self.board.positions[index]
 
-        next = common.add_elements(self.snake_position[0], direction)
-        
         self.snake_position.appendleft(next)
+        head_slot = self.occupy_cell(index)
+        head_laid_at = self.laid_at[index]
+        self.laid_at[index] = self.moves
 
         if next == self.goal:
             self.points += 1
@@ -118,61 +343,31 @@ class Snake:
             goal = self.generate_goal()
             if not goal:
                 self.state = Snake.WON
-                return
-            self.goal = goal
+            else:
+                self.goal = goal
+            return undo + (head_slot, head_laid_at, None)
         else:
-            self.snake_position.pop()
+            tail = self.snake_position.pop()
+            self.vacate_cell(tail[0] + tail[1] * self.width)
+            return undo + (head_slot, head_laid_at, tail)
 
     def is_direction_safe(self, direction):
-        next = common.add_elements(self.snake_position[0], direction)
-        if next in itertools.islice(self.snake_position, 0, len(self.snake_position) - 1):
+        steps = self.board.steps.get(direction)
+        if steps is None:
             return False
-        return common.in_bounds(next, (self.width, self.height))
-
-    def render(self, screen, width, height):
-        GOAL = (255,0,0)
-        SNAKE_COLOR = (0, 255, 0)
-        SNAKE_GAP_COLOR = (127, 200, 127)
-        SNAKE_GAP_PORTION = 0.1
-
-        BACKGROUND_COLOR = (50, 50, 50)
-        WIN_TEXT_COLOR = (255, 0, 0)
-        LOST_TEXT_COLOR = (255, 0, 0)
-
-        if self.font is None:
-            self.font=pygame.font.SysFont('timesnewroman',  30)
-            self.win_text = self.font.render("You Win", True, WIN_TEXT_COLOR)
-            self.lose_text = self.font.render("You Lose", True, LOST_TEXT_COLOR)
-
-
-        screen.fill(BACKGROUND_COLOR)
-
-        cell_size = min(width / self.width, height / self.height)
-        gap = SNAKE_GAP_PORTION * cell_size
-
-        last = None
-        for pip in self.snake_position:
-            pygame.draw.rect(screen, SNAKE_COLOR, [
-                        cell_size * pip[0] + gap,
-                        cell_size * pip[1] + gap,
-                        cell_size - 2 * gap, 
-                        cell_size - 2 * gap,
-                    ])
-            if last and last != pip:
-                middle = common.average_elements(pip, last)
-                w = cell_size - 2 * gap if pip[0] == last[0] else gap * 2 + 2
-                h = gap * 2 + 2 if pip[0] == last[0] else cell_size - 2 * gap
-                x = middle[0] * cell_size + cell_size / 2 - w / 2
-                y = middle[1] * cell_size + cell_size / 2 - h / 2
-                pygame.draw.rect(screen, SNAKE_GAP_COLOR, [x, y, w, h])
-
-
-            last = pip
-
-        pygame.draw.ellipse(screen, GOAL, [cell_size * self.goal[0], cell_size * self.goal[1], cell_size, cell_size])
-
-        if self.state == Snake.DIED:
-            screen.blit(self.lose_text, (100, 100))
-
-        if self.state == Snake.WON:
-            screen.blit(self.win_text, (100, 100))
\ No newline at end of file
+        head = self.snake_position[0]
+        index = steps[head[0] + head[1] * self.width]
+        if index < 0:
+            return False
+        # The tail moves out of the way, so it doesn't count as blocking.
+        count = self.occupancy[index]
+        if self.board.positions[index] == self.snake_position[-1]:
+            count -= 1
+        return count == 0
+
+def replay(width, height, seed, moves):
+    """Rebuild a game by playing a list of moves from its seed."""
+    game = Snake(width, height, seed)
+    for move in moves:
+        game.advance(move)
+    return game
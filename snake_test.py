@@ -0,0 +1,234 @@
+import itertools
+import random
+
+import grid
+from snake import Snake, replay
+
+def occupancy_from_body(game):
+    expected = bytearray(game.get_width() * game.get_height())
+    for pos in game.get_snake_position():
+        expected[game.cell_index(pos)] += 1
+    return expected
+
+def test_occupancy_starts_with_stacked_snake():
+    game = Snake(6, 6)
+    assert game.get_occupancy()[game.cell_index((3,3))] == 3
+    assert sum(game.get_occupancy()) == 3
+    assert game.is_occupied((3,3))
+    assert not game.is_occupied((0,0))
+
+def test_occupancy_follows_moves():
+    random.seed(1)
+    for _ in range(20):
+        game = Snake(6, 6)
+        while game.get_state() == Snake.PLAYING:
+            game.advance(random.choice(Snake.VALID_DIRECTIONS))
+            assert game.get_occupancy() == occupancy_from_body(game)
+
+def test_laid_at_gives_turns_until_free():
+    random.seed(3)
+    for _ in range(20):
+        game = Snake(6, 6)
+        while game.get_state() == Snake.PLAYING:
+            body = list(game.get_snake_position())
+            laid_at = game.get_laid_at()
+            for index in range(36):
+                pos = (index % 6, index // 6)
+                turns = len(body) - 1 - (game.get_moves() - laid_at[index])
+                if pos in body:
+                    assert turns == len(body) - body.index(pos) - 1
+                else:
+                    assert turns <= 0
+            game.advance(random.choice(Snake.VALID_DIRECTIONS))
+
+def test_is_direction_safe_matches_body_scan():
+    random.seed(2)
+    for _ in range(20):
+        game = Snake(6, 6)
+        while game.get_state() == Snake.PLAYING:
+            body = game.get_snake_position()
+            for direction in Snake.VALID_DIRECTIONS:
+                next = (body[0][0] + direction[0], body[0][1] + direction[1])
+                expected = 0 <= next[0] < 6 and 0 <= next[1] < 6 \
+                    and next not in itertools.islice(body, 0, len(body) - 1)
+                assert game.is_direction_safe(direction) == expected
+            game.advance(random.choice(Snake.VALID_DIRECTIONS))
+
+def test_can_follow_tail():
+    game = Snake(6, 6)
+    game.set_snake_position([(1,1), (2,1), (2,2), (1,2)])
+    game.goal = (5,5)
+    assert game.is_direction_safe(Snake.SOUTH)
+    game.advance(Snake.SOUTH)
+    assert game.get_state() == Snake.PLAYING
+    assert game.get_occupancy() == occupancy_from_body(game)
+
+def test_set_snake_position():
+    game = Snake(4, 4)
+    game.set_snake_position([(0,0), (1,0)])
+    assert game.is_occupied((0,0))
+    assert game.is_occupied((1,0))
+    assert not game.is_occupied((2,2))
+    assert not game.is_direction_safe(Snake.NORTH)
+    assert game.is_direction_safe(Snake.EAST)
+
+def assert_free_cells_consistent(game):
+    free = game.free_cells
+    assert sorted(free) == [i for i, count in enumerate(game.get_occupancy()) if not count]
+    for slot, index in enumerate(free):
+        assert game.free_slots[index] == slot
+
+def test_free_cells_follow_moves():
+    random.seed(3)
+    for _ in range(20):
+        game = Snake(5, 5)
+        assert_free_cells_consistent(game)
+        while game.get_state() == Snake.PLAYING:
+            game.advance(random.choice(Snake.VALID_DIRECTIONS))
+            assert_free_cells_consistent(game)
+            if game.get_state() == Snake.PLAYING:
+                assert not game.is_occupied(game.get_goal())
+
+def test_goal_none_when_board_full():
+    game = Snake(2, 2)
+    game.set_snake_position([(0,0), (1,0), (1,1), (0,1)])
+    assert game.generate_goal() is None
+
+def test_copy_is_independent():
+    game = Snake(6, 6)
+    game.advance(Snake.NORTH)
+    game.set_ai_data('plan')
+    other = game.copy()
+    assert other.get_snake_position() == game.get_snake_position()
+    assert other.get_goal() == game.get_goal()
+    assert other.get_moves() == game.get_moves()
+    assert other.get_ai_data() is None
+
+    other.advance(Snake.NORTH)
+    assert other.get_snake_head() != game.get_snake_head()
+    assert game.get_occupancy() == occupancy_from_body(game)
+    assert other.get_occupancy() == occupancy_from_body(other)
+    assert_free_cells_consistent(game)
+    assert_free_cells_consistent(other)
+
+def test_copy_does_not_use_random():
+    game = Snake(6, 6)
+    state = random.getstate()
+    game.copy()
+    assert random.getstate() == state
+
+def snapshot(game):
+    return (game.get_state(), list(game.get_snake_position()),
+        bytes(game.get_occupancy()), list(game.free_cells),
+        list(game.free_slots), game.get_goal(), game.get_moves(),
+        game.get_points(), game.get_moves_since_point(),
+        game.get_state_key(), list(game.get_laid_at()))
+
+def test_pop_move_reverts_push_move():
+    random.seed(4)
+    for _ in range(50):
+        game = Snake(5, 5)
+        while game.get_state() == Snake.PLAYING:
+            before = snapshot(game)
+            moves = [random.choice(Snake.VALID_DIRECTIONS) for _ in range(3)]
+            for move in moves:
+                game.push_move(move)
+            for move in moves:
+                game.pop_move()
+            assert snapshot(game) == before
+            game.advance(moves[0])
+
+def test_pop_move_reverts_death_and_win():
+    game = Snake(2, 2)
+    game.set_snake_position([(0,0), (1,0), (1,1)])
+    game.goal = (0,1)
+    before = snapshot(game)
+    game.push_move(Snake.SOUTH)
+    assert game.get_state() == Snake.WON
+    game.pop_move()
+    assert snapshot(game) == before
+    game.push_move(Snake.NORTH)
+    assert game.get_state() == Snake.DIED
+    game.push_move(Snake.SOUTH)
+    game.pop_move()
+    game.pop_move()
+    assert snapshot(game) == before
+
+def play_randomly(game, rng):
+    moves = []
+    while game.get_state() == Snake.PLAYING:
+        safe = [x for x in Snake.VALID_DIRECTIONS if game.is_direction_safe(x)]
+        move = rng.choice(safe) if safe else Snake.NORTH
+        game.advance(move)
+        moves.append(move)
+    return moves
+
+def test_seed_fixes_goals():
+    assert Snake(10, 10, 7).get_goal() == Snake(10, 10, 7).get_goal()
+    goals = {Snake(10, 10, seed).get_goal() for seed in range(20)}
+    assert len(goals) > 1
+
+    # The goal sequence doesn't depend on the global random state.
+    random.seed(1)
+    a = Snake(10, 10, 7)
+    random.seed(2)
+    b = Snake(10, 10, 7)
+    assert a.get_goal() == b.get_goal()
+
+def test_replay():
+    rng = random.Random(8)
+    for seed in range(10):
+        game = Snake(6, 6, seed)
+        moves = play_randomly(game, rng)
+        again = replay(6, 6, seed, moves)
+        assert snapshot(again) == snapshot(game)
+
+def test_search_does_not_change_goals():
+    rng = random.Random(9)
+    game = Snake(6, 6, 3)
+    moves = play_randomly(game, rng)
+
+    searched = Snake(6, 6, 3)
+    for move in moves:
+        # Explore a little from a copy and in place before each real move.
+        other = searched.copy()
+        for _ in range(3):
+            other.advance(rng.choice(Snake.VALID_DIRECTIONS))
+        for _ in range(3):
+            searched.push_move(rng.choice(Snake.VALID_DIRECTIONS))
+        for _ in range(3):
+            searched.pop_move()
+        searched.advance(move)
+    assert snapshot(searched) == snapshot(game)
+
+def expected_state_key(game):
+    tables = grid.board(game.get_width(), game.get_height())
+    cell_keys, head_keys = tables.cell_keys, tables.head_keys
+    key = head_keys[game.cell_index(game.get_snake_head())]
+    for index in set(game.cell_index(x) for x in game.get_snake_position()):
+        key ^= cell_keys[index]
+    return key
+
+def test_state_key_follows_moves():
+    rng = random.Random(10)
+    for seed in range(20):
+        game = Snake(6, 6, seed)
+        while game.get_state() == Snake.PLAYING:
+            assert game.get_state_key() == expected_state_key(game)
+            assert game.copy().get_state_key() == game.get_state_key()
+            game.push_move(rng.choice(Snake.VALID_DIRECTIONS))
+            if game.get_state() == Snake.PLAYING:
+                assert game.get_state_key() == expected_state_key(game)
+            game.pop_move()
+            game.advance(rng.choice(Snake.VALID_DIRECTIONS))
+
+def test_state_key_identifies_positions():
+    a = Snake(6, 6)
+    a.set_snake_position([(1,1), (1,2), (2,2)])
+    b = Snake(6, 6)
+    b.set_snake_position([(2,2), (1,2), (1,1)])
+    c = Snake(6, 6)
+    c.set_snake_position([(1,1), (2,1), (2,2)])
+    assert a.get_occupancy_key() == b.get_occupancy_key()
+    assert a.get_state_key() != b.get_state_key()
+    assert a.get_occupancy_key() != c.get_occupancy_key()
@@ -1,6 +1,7 @@
 from collections import deque
 
 import common
+import grid
 import itertools
 from search import a_star_search
 from snake import Snake
@@ -16,10 +17,10 @@ from snake import Snake
 
 def supercell(pos):
     """Return the position of the supercell containing a position."""
-    return tuple([x - x % 2 for x in pos])
+    return (pos[0] - pos[0] % 2, pos[1] - pos[1] % 2)
 
 def subcell(pos):
-    return tuple([x % 2 for x in pos])
+    return (pos[0] % 2, pos[1] % 2)
 
 SUPERCELL_DIRECTIONS = {
     (2,0),
@@ -35,7 +36,8 @@ CLOCKWISE_IN_TABLE = {
     (0,1) : (0,0)
 }
 def clockwise_in(pos):
-    return common.add_elements(supercell(pos), CLOCKWISE_IN_TABLE[subcell(pos)])
+    x, y = CLOCKWISE_IN_TABLE[subcell(pos)]
+    return (pos[0] - pos[0] % 2 + x, pos[1] - pos[1] % 2 + y)
 
 CLOCKWISE_OUT_TABLE = {
     (0,0) : (0,-1),
@@ -44,7 +46,8 @@ CLOCKWISE_OUT_TABLE = {
     (0,1) : (-1,1)
 }
 def clockwise_out(pos):
-    return common.add_elements(supercell(pos), CLOCKWISE_OUT_TABLE[subcell(pos)])
+    x, y = CLOCKWISE_OUT_TABLE[subcell(pos)]
+    return (pos[0] - pos[0] % 2 + x, pos[1] - pos[1] % 2 + y)
 
 # Unused
 def supercellerate(snake):
@@ -93,13 +96,13 @@ def clockwise_reachable(path, idx):
     current = path[idx]
     if len(path) == 1:
         assert idx == 0
-        return map(lambda x: common.add_elements(current, x), SUPERCELL_DIRECTIONS)
+        return [(current[0] + x, current[1] + y) for x, y in SUPERCELL_DIRECTIONS]
 
     before = path[idx - 1]
     after = path[(idx + 1) % len(path)]
 
-    dir_before = common.subtract_elements(before, current)
-    dir_after = common.subtract_elements(after, current)
+    dir_before = (before[0] - current[0], before[1] - current[1])
+    dir_after = (after[0] - current[0], after[1] - current[1])
     assert dir_before in SUPERCELL_DIRECTIONS
     assert dir_after in SUPERCELL_DIRECTIONS
 
@@ -108,7 +111,7 @@ def clockwise_reachable(path, idx):
     while attempt != dir_after:
         possible.append(attempt)
         attempt = clockwise_rotate(attempt)
-    return map(lambda x: common.add_elements(current, x), possible)
+    return [(current[0] + x, current[1] + y) for x, y in possible]
 
 def find_path_to_goal(width, height, old_path, goal, head_pos=None):
     assert not (width % 2) and not (height % 2)
@@ -131,9 +134,12 @@ def find_path_to_goal(width, height, old_path, goal, head_pos=None):
             already_contained = True
     assert not already_contained
 
+    adjacent = grid.board(width, height).supercell_adjacent
+
     def list_adjacent(state):
         def test_position(x):
-            return x not in blocked and common.in_bounds(x, (width, height))
+            return x not in blocked \
+                and 0 <= x[0] < width and 0 <= x[1] < height
 
         if isinstance(state, Forward):
             if state.steps + 1 < len(old_path):
@@ -144,29 +150,26 @@ def find_path_to_goal(width, height, old_path, goal, head_pos=None):
                     return
                 pos = head_pos
                 end = old_path[1 % len(old_path)]
-                while (out_cell := common.add_elements(supercell(CLOCKWISE_OUT_TABLE[subcell(pos)]),
-                            supercell(pos))) != end:
+                while (out_cell := supercell(clockwise_out(pos))) != end:
                     if test_position(out_cell):
                         yield out_cell
-                    pos = common.add_elements(CLOCKWISE_IN_TABLE[subcell(pos)], supercell(pos))
+                    pos = clockwise_in(pos)
                 return
 
             yield from filter(test_position, clockwise_reachable(old_path, state.steps))
             return
 
-        yield from filter(test_position, [
-            common.add_elements(state, (2,0)),
-            common.add_elements(state, (-2,0)),
-            common.add_elements(state, (0,2)),
-            common.add_elements(state, (0,-2)),
-        ])
+        for x in adjacent[state[0] + state[1] * width]:
+            if x not in blocked:
+                yield x
     
     def heuristic(state):
         if isinstance(state, Forward):
-            return common.grid_distance(old_path[state.steps], goal) // 2
-        return common.grid_distance(state, goal) // 2
+            state = old_path[state.steps]
+        return (abs(state[0] - goal[0]) + abs(state[1] - goal[1])) // 2
 
-    new_path = a_star_search(start_state=Forward(0), heuristic=heuristic, list_adjacent=list_adjacent)
+    new_path = a_star_search(start_state=Forward(0), heuristic=heuristic,
+            list_adjacent=list_adjacent, frontier='bucket')
     return list(map(lambda x: old_path[x.steps] if isinstance(x, Forward) else x, new_path))
 
 def add_to_path(old_path, additions, idx):
@@ -244,9 +247,9 @@ def ai_supercellerator_v1(game):
         position = supercell(game.get_snake_head())
         occupying = deque([
                 position,
-                common.add_elements(position, (2,0)),
-                common.add_elements(position, (2,2)),
-                common.add_elements(position, (2,0))])
+                (position[0] + 2, position[1]),
+                (position[0] + 2, position[1] + 2),
+                (position[0] + 2, position[1])])
         assert_path_valid(width, height, occupying)
         game.set_ai_data(occupying)
 
@@ -267,4 +270,4 @@ def ai_supercellerator_v1(game):
     if supercell(next) == supercell(occupying[1]):
         occupying.append(occupying.popleft())
 
-    return common.subtract_elements(next, head)
+    return (next[0] - head[0], next[1] - head[1])
@@ -80,4 +80,10 @@ def test_reduce_path():
     assert reduce_path(start, deque([(0,0), (1,0)]), (0,0)) == deque([(0,0), (0,2)])
 
     start = deque([(0,0), (2,0), (4,0), (2,0), (2,2), (2,4), (2,2), (2,0), (0,0), (0,2)])
-    assert reduce_path(start, deque([(0,0), (1,0)]), (0,0)) == deque([(0,0), (0,2)])
\ No newline at end of file
+    assert reduce_path(start, deque([(0,0), (1,0)]), (0,0)) == deque([(0,0), (0,2)])
+
+def test_ai_supercellerator_v1_wins():
+    game = Snake(10, 10, 0)
+    while game.get_state() == Snake.PLAYING:
+        game.advance(ai_supercellerator_v1(game))
+    assert game.get_state() == Snake.WON
@@ -0,0 +1,170 @@
+"""Connectivity of the free 2x2 supercells of a board, as used by
+ai.supergrid_factor, kept up to date as the snake moves.
+
+A supercell is the 2x2 area with its top left corner at even (x, y), and it is
+free if none of its four cells are occupied. Free supercells next to each
+other (two cells apart) are connected, and the size of the largest connected
+area is what supergrid_factor measures.
+
+The areas are held in a union-find. A supercell coming free (as the tail
+leaves it) is joined to its free neighbors straight away. A supercell being
+covered (as the head enters it) might split its area in two, which a
+union-find can't undo, so it is first checked against the ring of eight
+supercells around it: if its free neighbors are still joined through that
+ring, the area just loses one supercell. Only when they aren't is the whole
+structure rebuilt, and then only once it is next asked for the largest area.
+"""
+
+import grid
+
+class Supergrid:
+    """The free supercells of a board and the areas they form."""
+
+    __slots__ = ['width', 'height', 'supercells', 'neighbors', 'rings',
+            'counts', 'node', 'parent', 'size', 'dirty', 'best']
+
+    def __init__(self, width, height, occupancy):
+        """Track a board given its occupancy (as Snake.get_occupancy: a
+        count of segments for each cell, indexed by x + y * width).
+        """
+        self.width = width
+        self.height = height
+        board = grid.board(width, height)
+        self.supercells = board.supercells
+        self.neighbors = board.supercell_neighbors
+        self.rings = board.supercell_rings
+        # Occupied cells in each supercell.
+        self.counts = [0] * len(self.neighbors)
+        for index, supercell in enumerate(self.supercells):
+            if supercell >= 0 and occupancy[index]:
+                self.counts[supercell] += 1
+        self.rebuild()
+
+    def copy(self):
+        other = Supergrid.__new__(Supergrid)
+        other.width = self.width
+        other.height = self.height
+        other.supercells = self.supercells
+        other.neighbors = self.neighbors
+        other.rings = self.rings
+        other.counts = self.counts[:]
+        other.node = self.node[:]
+        other.parent = self.parent[:]
+        other.size = self.size[:]
+        other.dirty = self.dirty
+        other.best = self.best
+        return other
+
+    def rebuild(self):
+        """Rebuild the union-find from the free supercells."""
+        counts = self.counts
+        # The union-find entry of each free supercell (-1 if covered).
+        # Covered supercells can leave entries behind in the union-find, so
+        # a supercell that comes free again gets a new one.
+        self.node = [x if not counts[x] else -1 for x in range(len(counts))]
+        self.parent = list(range(len(counts)))
+        # Free supercells under each root.
+        self.size = [0 if x else 1 for x in counts]
+        self.dirty = False
+        self.best = None
+        for supercell, node in enumerate(self.node):
+            if node >= 0:
+                for neighbor in self.neighbors[supercell]:
+                    if neighbor > supercell and self.node[neighbor] >= 0:
+                        self.union(node, self.node[neighbor])
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a, b):
+        """Join the areas holding two entries, returning the new root."""
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+    def cover_cell(self, index):
+        """Note that a cell has become occupied."""
+        supercell = self.supercells[index]
+        if supercell < 0:
+            return
+        self.counts[supercell] += 1
+        if self.counts[supercell] > 1 or self.dirty:
+            return
+
+        node = self.node[supercell]
+        self.node[supercell] = -1
+        if not self.still_joined(supercell):
+            self.dirty = True
+            return
+        root = self.find(node)
+        self.size[root] -= 1
+        if self.best == self.size[root] + 1:
+            self.best = None
+
+    def free_cell(self, index):
+        """Note that a cell is no longer occupied."""
+        supercell = self.supercells[index]
+        if supercell < 0:
+            return
+        self.counts[supercell] -= 1
+        if self.counts[supercell] or self.dirty:
+            return
+
+        node = len(self.parent)
+        if node > 4 * len(self.counts):
+            # Too many left over entries, so start afresh.
+            self.dirty = True
+            return
+        self.parent.append(node)
+        self.size.append(1)
+        self.node[supercell] = node
+        for neighbor in self.neighbors[supercell]:
+            if self.node[neighbor] >= 0:
+                node = self.union(node, self.node[neighbor])
+        if self.best is not None:
+            self.best = max(self.best, self.size[self.find(node)])
+
+    def still_joined(self, supercell):
+        """Check that the free neighbors of a newly covered supercell are
+        still joined through the ring of supercells around it.
+        """
+        counts = self.counts
+        free = [x >= 0 and not counts[x] for x in self.rings[supercell]]
+        if free[0] + free[2] + free[4] + free[6] <= 1:
+            return True
+        if all(free):
+            return True
+
+        # Count the runs of free ring supercells that hold a neighbor,
+        # starting just after a covered one.
+        start = free.index(False)
+        runs = 0
+        holds_neighbor = False
+        for step in range(1, 9):
+            position = (start + step) % 8
+            if not free[position]:
+                runs += holds_neighbor
+                holds_neighbor = False
+            elif position % 2 == 0:
+                holds_neighbor = True
+        return runs + holds_neighbor <= 1
+
+    def largest(self):
+        """Return the number of supercells in the largest free area."""
+        if self.dirty:
+            self.rebuild()
+        if self.best is None:
+            parent = self.parent
+            self.best = max((self.size[x] for x in range(len(parent))
+                    if parent[x] == x), default=0)
+        return self.best
@@ -0,0 +1,88 @@
+import random
+
+from snake import Snake
+from supergrid import *
+
+def largest_area(width, height, occupancy):
+    """The largest area of free supercells, found by searching the board."""
+    def free(x, y):
+        return 0 <= x and x + 1 < width and 0 <= y and y + 1 < height \
+            and not any(occupancy[x + dx + (y + dy) * width]
+                    for dx in (0, 1) for dy in (0, 1))
+
+    explored = set()
+    largest = 0
+    for x in range(0, width, 2):
+        for y in range(0, height, 2):
+            if (x, y) in explored or not free(x, y):
+                continue
+            area = {(x, y)}
+            fringe = [(x, y)]
+            while fringe:
+                cx, cy = fringe.pop()
+                for next in [(cx + 2, cy), (cx - 2, cy), (cx, cy + 2), (cx, cy - 2)]:
+                    if next not in area and free(*next):
+                        area.add(next)
+                        fringe.append(next)
+            explored.update(area)
+            largest = max(largest, len(area))
+    return largest
+
+def test_largest():
+    assert Supergrid(4, 4, bytearray(16)).largest() == 4
+    assert Supergrid(8, 9, bytearray(72)).largest() == 16
+    occupancy = bytearray(64)
+    for y in range(8):
+        occupancy[3 + y * 8] = 1
+    assert Supergrid(8, 8, occupancy).largest() == 8
+
+def test_covering_splits_areas():
+    grid = Supergrid(6, 2, bytearray(12))
+    assert grid.largest() == 3
+    grid.cover_cell(2)
+    assert grid.largest() == 1
+    grid.cover_cell(3)
+    assert grid.largest() == 1
+    grid.free_cell(2)
+    grid.free_cell(3)
+    assert grid.largest() == 3
+
+def test_follows_random_changes():
+    rng = random.Random(0)
+    for _ in range(200):
+        width, height = rng.randint(1, 10), rng.randint(1, 10)
+        occupancy = bytearray(width * height)
+        grid = Supergrid(width, height, occupancy)
+        for _ in range(100):
+            index = rng.randrange(width * height)
+            if occupancy[index] and rng.random() < 0.5:
+                occupancy[index] -= 1
+                if not occupancy[index]:
+                    grid.free_cell(index)
+            else:
+                if not occupancy[index]:
+                    grid.cover_cell(index)
+                occupancy[index] += 1
+            if rng.random() < 0.1:
+                grid = grid.copy()
+            assert grid.largest() == largest_area(width, height, occupancy)
+
+def test_snake_keeps_supergrid():
+    random.seed(8)
+    for _ in range(10):
+        game = Snake(8, 8)
+        game.track_supergrid()
+        while game.get_state() == Snake.PLAYING:
+            moves = [random.choice(Snake.VALID_DIRECTIONS) for _ in range(3)]
+            for move in moves:
+                game.push_move(move)
+                assert game.get_supergrid().largest() \
+                    == largest_area(8, 8, game.get_occupancy())
+            for move in moves:
+                game.pop_move()
+            copy = game.copy()
+            copy.advance(moves[0])
+            game.advance(moves[0])
+            for tracked in [game, copy]:
+                assert tracked.get_supergrid().largest() \
+                    == largest_area(8, 8, tracked.get_occupancy())